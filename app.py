@@ -5,7 +5,10 @@ This file serves as an entry point for the Repo Scanner application,
 delegating to the actual implementation in the scanner package.
 """
 
+import os
+
 from scanner.app import app
 
 if __name__ == '__main__':
-    app.run(debug=True, host='0.0.0.0', port=5000)
\ No newline at end of file
+    # Set FLASK_DEBUG=1 for the debugger and reloader; requests are served on threads
+    app.run(debug=os.environ.get('FLASK_DEBUG') == '1', host='0.0.0.0', port=5000, threaded=True)
\ No newline at end of file
@@ -1,13 +1,48 @@
-from flask import Flask, render_template, request, redirect, url_for, jsonify, flash, Response, stream_with_context
+from flask import Flask, render_template, request, redirect, url_for, jsonify, flash, Response, stream_with_context, g
 import os
 import subprocess
+import shutil
 import re
 import mimetypes
 from pathlib import Path
+from urllib.parse import urlsplit
 import logging
 import json
 from datetime import datetime
-from functools import wraps
+from functools import wraps, lru_cache
+import codecs
+import hashlib
+import mmap
+import threading
+import weakref
+import queue
+import time
+from collections import OrderedDict, deque
+from concurrent.futures import ThreadPoolExecutor, ProcessPoolExecutor
+from concurrent.futures.process import BrokenProcessPool
+import multiprocessing
+from dataclasses import dataclass
+from typing import Optional
+from markupsafe import Markup, escape
+from flask.json.provider import DefaultJSONProvider
+
+# Hyperscan is an optional accelerator for the file scan; fall back to re without it
+try:
+    import hyperscan
+except ImportError:
+    hyperscan = None
+
+# pathspec lets the file walker honour .gitignore files where git can't be asked
+try:
+    import pathspec
+except ImportError:
+    pathspec = None
+
+# orjson serializes large TODO lists several times faster than the stdlib encoder
+try:
+    import orjson
+except ImportError:
+    orjson = None
 
 # Import our robust error handling system - now import directly since we're in the scanner package
 from .error_handling import (
@@ -17,9 +52,41 @@ from .error_handling import (
     with_error_handling, error_context, safe_operation
 )
 
+class OrjsonProvider(DefaultJSONProvider):
+    """Flask JSON provider that encodes with orjson; request bodies are still parsed by the stdlib.
+
+    sort_keys and compact are honoured as by the default provider. Calls that
+    pass json.dumps options orjson can't express are handed to the default
+    provider unchanged.
+    """
+    
+    def _encode(self, obj, indent=False):
+        # self.default covers the types orjson doesn't know natively (Decimal, UUID subclasses, ...)
+        option = orjson.OPT_NON_STR_KEYS
+        if self.sort_keys:
+            option |= orjson.OPT_SORT_KEYS
+        if indent:
+            option |= orjson.OPT_INDENT_2
+        return orjson.dumps(obj, default=self.default, option=option)
+    
+    def dumps(self, obj, **kwargs):
+        if kwargs:
+            return super().dumps(obj, **kwargs)
+        return self._encode(obj).decode()
+    
+    def response(self, *args, **kwargs):
+        obj = self._prepare_response_obj(args, kwargs)
+        indent = self.compact is False or (self.compact is None and self._app.debug)
+        return self._app.response_class(self._encode(obj, indent), mimetype=self.mimetype)
+
 app = Flask(__name__)
+if orjson is not None:
+    # Every jsonify() call, including the API error handlers, goes through orjson
+    app.json = OrjsonProvider(app)
 app.logger.setLevel(logging.INFO)  # Ensure INFO level is set for our logs
-app.secret_key = os.urandom(24)  # Required for flash messages
+# Required for flash messages; set SECRET_KEY in production so every worker signs
+# cookies with the same key and sessions survive restarts
+app.secret_key = os.environ.get('SECRET_KEY') or os.urandom(24)
 
 # Initialize the centralized error handler
 app.error_handler = ErrorHandler(app.logger)
@@ -27,6 +94,173 @@ app.error_handler = ErrorHandler(app.logger)
 # Configure base repository path
 BASE_REPO_PATH = os.path.join(os.path.dirname(os.path.abspath(__file__)), "repositories")
 
+# Accepted clone URLs: http(s)/git/ssh URLs with a path, or scp-style git@host:path.
+# These patterns are unanchored and always applied with fullmatch, since $ would
+# also accept a trailing newline
+REPO_URL_RE = re.compile(
+    r'(?:(?:https?|git|ssh)://[A-Za-z0-9._~%+@:-]+(?:/[A-Za-z0-9._~%+-]+)+/?'
+    r'|git@[A-Za-z0-9.-]+:[A-Za-z0-9._~%+/-]+)'
+)
+
+# Local repository directory names: a single path component that isn't . or ..
+REPO_NAME_RE = re.compile(r'(?!\.{1,2}\Z)[A-Za-z0-9._-]+')
+# Full SHA-1 or SHA-256 object name as stored in HEAD and ref files
+COMMIT_SHA_RE = re.compile(r'[0-9a-f]{40}(?:[0-9a-f]{24})?')
+# Section header for the origin remote in .git/config, e.g. [remote "origin"]; section
+# names are case-insensitive in git, subsection names are not
+ORIGIN_SECTION_RE = re.compile(r'^\[\s*(?i:remote)\s+"origin"\s*\]')
+
+# Expanded pattern to match more comment styles and annotation types
+# This includes TODO, FIXME, BUG, and NOTE in various comment formats
+TODO_RE = re.compile(
+    r'(?:#+|//|/\*|<!--|;)\s*(?:TODO|FIXME|BUG|NOTE)(?:\s*:|(?:\s+))',
+    re.IGNORECASE
+)
+
+# Bytes form of TODO_RE for matching across a whole mmap'd file; the gap before the
+# keyword may not cross a newline and the trailing check is a lookahead, so every
+# match stays on the line it starts on. A keyword that ends the file also matches,
+# as git grep reports it (see GIT_GREP_TODO_PATTERN)
+TODO_RE_BYTES = re.compile(
+    rb'(?:#+|//|/\*|<!--|;)[^\S\n]*(?:TODO|FIXME|BUG|NOTE)(?=\s*:|\s|\Z)',
+    re.IGNORECASE
+)
+
+# Hyperscan has no lookahead; the trailing whitespace/colon is matched instead, which
+# can only extend a match past its own line, never move where it starts
+TODO_HYPERSCAN_PATTERN = rb'(?:#+|//|/\*|<!--|;)[^\S\n]*(?:TODO|FIXME|BUG|NOTE)(?:\s*:|\s|$)'
+
+# POSIX ERE equivalent of TODO_RE for `git grep -E`; git matches lines without their
+# newline, so $ stands in for the trailing whitespace, including at the end of the file
+GIT_GREP_TODO_PATTERN = r'(#+|//|/\*|<!--|;)[[:space:]]*(TODO|FIXME|BUG|NOTE)([[:space:]]*:|[[:space:]]+|$)'
+
+# Pattern used by the highlight_todo template filter to wrap the keyword in a span
+TODO_HIGHLIGHT_RE = re.compile(
+    r'(?:#+|//|/\*|<!--|;)\s*(?:TODO|FIXME|BUG|NOTE)|(?:TODO|FIXME|BUG|NOTE):',
+    re.IGNORECASE
+)
+HIGHLIGHT_SPAN = '<span class="highlight">{}</span>'
+
+# Number of leading bytes inspected when a file's type can't be guessed from its name
+TEXT_SNIFF_BYTES = 8192
+TEXT_PRINTABLE_BYTES = bytes(range(32, 127)) + b'\t\n\r\f\b'
+
+# Load the system MIME tables now rather than on the first guess_type call, which
+# could otherwise happen concurrently on several scan threads
+mimetypes.init()
+
+# Extensions that are always binary, so is_text_file can reject them without any I/O
+BINARY_EXTS = frozenset({
+    '.png', '.jpg', '.jpeg', '.gif', '.pdf', '.zip', '.gz', '.tar', '.so', '.o', '.a',
+    '.dylib', '.dll', '.exe', '.pyc', '.class', '.jar', '.wasm', '.woff', '.woff2',
+    '.ttf', '.ico', '.mp4', '.mp3'
+})
+# Extensions that are always text. Checked before mimetypes, which knows nothing of
+# some of them (.go, .php) and maps others to non-text types (.rs, .json, .svg)
+TEXT_EXTS = frozenset({
+    '.py', '.js', '.jsx', '.ts', '.tsx', '.c', '.h', '.cc', '.cpp', '.hpp', '.cs',
+    '.java', '.kt', '.swift', '.go', '.rs', '.rb', '.php', '.sh', '.sql', '.md',
+    '.txt', '.rst', '.html', '.css', '.scss', '.json', '.yaml', '.yml', '.toml',
+    '.xml', '.svg'
+})
+
+# Clone options shared by every clone: latest commit of the default branch only
+SHALLOW_CLONE_ARGS = ('--quiet', '--depth', '1', '--single-branch', '--no-tags')
+
+# Seconds a clone may take before git is killed
+CLONE_TIMEOUT = 120
+
+# Fetch options used to move an existing clone to the remote's latest commit
+SHALLOW_FETCH_ARGS = ('--quiet', '--no-tags', '--depth', '1', 'origin', 'HEAD')
+
+# Stream settings for git commands whose output is never read: nothing on stdin,
+# stdout discarded, and only stderr kept for error reporting
+GIT_QUIET_IO = {'stdin': subprocess.DEVNULL, 'stdout': subprocess.DEVNULL, 'stderr': subprocess.PIPE}
+
+# madvise hint used to prefetch mapped files where the platform supports it (Linux, BSD)
+MMAP_WILLNEED = getattr(mmap, 'MADV_WILLNEED', None)
+
+# Lowercased keywords for the substring prefilter that runs before TODO_RE_BYTES
+TODO_KEYWORDS = (b'todo', b'fixme', b'bug', b'note')
+
+# Slice size used when scanning a mapped file piecewise, bounding the bytes copied at once
+NEWLINE_COUNT_WINDOW = 64 * 1024
+
+# Read buffer for git grep's output; records are consumed line by line, so only
+# this much of the output is held at a time
+GIT_GREP_BUFFER_SIZE = 64 * 1024
+
+# Directories never worth descending into when looking for TODOs
+SKIP_DIRS = frozenset({
+    '.git', '.hg', '.svn', 'node_modules', '.venv', 'venv', '__pycache__', '.tox', '.mypy_cache',
+    '.pytest_cache', '.next'
+})
+
+# Scanning is I/O-bound, so use more threads than cores
+SCAN_WORKERS = min(32, (os.cpu_count() or 1) * 4)
+
+# Large walks are scanned in worker processes, PROCESS_SCAN_CHUNK files per task,
+# since re holds the GIL while matching; smaller ones stay on SCAN_WORKERS threads
+PROCESS_SCAN_MIN_FILES = 256
+PROCESS_SCAN_CHUNK = 64
+_scan_process_pool = None
+_scan_process_pool_lock = threading.Lock()
+
+# Minimum seconds between remote refreshes of an existing clone; see refresh_clone
+CLONE_REFRESH_INTERVAL = 60
+_clone_refreshed_at = {}
+_clone_refresh_lock = threading.Lock()
+
+# One lock per repository path; clones of different repositories run in parallel.
+# Entries vanish once no request holds or waits on the lock, so paths from old or
+# rejected requests don't accumulate
+_repo_locks = weakref.WeakValueDictionary()
+_repo_locks_lock = threading.Lock()
+
+# Default number of TODOs returned by one scan, and the most a client may ask for;
+# bounds memory and response time on repositories with pathological match counts
+MAX_TODO_RESULTS = 5000
+MAX_TODO_RESULTS_LIMIT = 50000
+
+# Completed scans kept in memory, keyed by (repo_path, HEAD); see iter_todos. The LRU
+# is bounded by the TODOs it holds rather than by entries, since one entry may be
+# anything from an empty scan to MAX_TODO_RESULTS_LIMIT rows
+TODO_CACHE_MAX_ROWS = 2 * MAX_TODO_RESULTS_LIMIT
+_todo_cache = OrderedDict()
+_todo_cache_rows = 0
+_todo_cache_lock = threading.Lock()
+# Directory under BASE_REPO_PATH holding completed scans on disk, one JSON file per
+# repository for its current HEAD; it has no .git, so it's never listed as a repository
+TODO_CACHE_DIRNAME = '.todo-cache'
+# Subdirectory of TODO_CACHE_DIRNAME for this scanner's cached scans. It changes with
+# the file format and the matching rules, so an upgrade never replays scans made
+# under different rules; bump TODO_CACHE_FORMAT when the file layout changes
+TODO_CACHE_FORMAT = 3
+TODO_CACHE_VERSION = f"v{TODO_CACHE_FORMAT}-" + hashlib.sha1(repr((
+    TODO_RE.pattern, TODO_RE_BYTES.pattern, TODO_HYPERSCAN_PATTERN, GIT_GREP_TODO_PATTERN,
+    sorted(SKIP_DIRS), sorted(BINARY_EXTS), sorted(TEXT_EXTS)
+)).encode()).hexdigest()[:12]
+
+# Seconds a cached repository listing is trusted when nothing in BASE_REPO_PATH
+# has changed; see list_local_repositories
+REPO_LIST_CACHE_TTL = 30
+_repo_list_cache = {}
+_repo_list_cache_lock = threading.Lock()
+
+# TODOs sent per Server-Sent Events frame by /stream_data, and the longest a
+# partial batch is held back while the scan is still producing matches
+SSE_BATCH_SIZE = 32
+SSE_BATCH_INTERVAL = 0.05
+
+# Shortest gap between clone progress percentages relayed by /stream_data
+CLONE_PROGRESS_INTERVAL = 0.25
+
+# Template fragments joined into each chunk of a streamed results page
+TEMPLATE_STREAM_BUFFER = 32
+
+# Upper bound on repositories accepted by one batch scan request (also its thread count)
+MAX_BATCH_REPOSITORIES = 8
+
 # Register recovery strategies for different error types
 def git_recovery_strategy(error: ScannerError):
     """Recovery strategy for git operation failures"""
@@ -79,12 +313,12 @@ def handle_internal_error(error):
     )
     return handle_scanner_error(scanner_error)
 
+@dataclass(slots=True)
 class TodoItem:
-    def __init__(self, file_path, line_num, todo_text, next_line=None):
-        self.file_path = file_path
-        self.line_num = line_num
-        self.todo_text = todo_text
-        self.next_line = next_line
+    file_path: str
+    line_num: int
+    todo_text: str
+    next_line: Optional[str] = None
     
     def to_dict(self):
         return {
@@ -124,40 +358,134 @@ def is_valid_git_repo(path_to_check: str) -> bool:
         app.logger.debug(f"Path {path_to_check} is not a directory, skipping git check.")
         return False
 
+    # A work tree has a .git directory containing HEAD, or a .git file pointing
+    # at its gitdir (worktrees and submodules). Checking for these directly
+    # avoids starting a git process for every directory we list.
+    if _git_dir(path_to_check) is not None:
+        app.logger.debug(f"Path {path_to_check} is a valid git work tree.")
+        return True
+
+    app.logger.debug(f"Path {path_to_check} has no .git directory or gitdir file.")
+    return False
+
+def _git_dir(repo_path):
+    """Return the git directory of a work tree, or None if it doesn't have one."""
+    dot_git = os.path.join(repo_path, '.git')
+    if os.path.isfile(os.path.join(dot_git, 'HEAD')):
+        return dot_git
+    if not os.path.isfile(dot_git):
+        return None
     try:
-        # This command checks if the path is within a git working tree.
-        process = subprocess.run(
-            ['git', '-C', path_to_check, 'rev-parse', '--is-inside-work-tree'],
-            capture_output=True, text=True, check=False, timeout=5
-        )
+        with open(dot_git, encoding='utf-8') as f:
+            content = f.read().strip()
+    except OSError:
+        return None
+    if not content.startswith('gitdir:'):
+        return None
+    git_dir = os.path.join(repo_path, content[len('gitdir:'):].strip())
+    return git_dir if os.path.isdir(git_dir) else None
+
+def _read_head_sha(repo_path):
+    """Resolve HEAD to a commit SHA from the files in .git, or None if that isn't possible.
+
+    Follows a symbolic HEAD through the loose ref or packed-refs; anything else
+    (worktrees, unusual ref storage) is left to `git rev-parse`.
+    """
+    git_dir = _git_dir(repo_path)
+    if git_dir is None:
+        return None
+    try:
+        with open(os.path.join(git_dir, 'HEAD'), encoding='utf-8') as f:
+            head = f.read().strip()
+        if not head.startswith('ref:'):
+            return head if COMMIT_SHA_RE.fullmatch(head) else None
         
-        if process.returncode == 0 and process.stdout.strip() == 'true':
-            app.logger.debug(f"Path {path_to_check} is a valid git work tree.")
-            return True
-        else:
-            app.logger.debug(
-                f"Path {path_to_check} is not recognized as a git work tree by 'rev-parse --is-inside-work-tree'. "
-                f"Return Code: {process.returncode}, Stdout: '{process.stdout.strip()}', Stderr: '{process.stderr.strip()}'"
-            )
-            return False
-            
-    except subprocess.TimeoutExpired as e:
-        raise GitOperationError(f"Timeout checking if {path_to_check} is a git repo", 
-                               git_command="git rev-parse", original_exception=e)
-    except FileNotFoundError as e:
-        raise SystemError("Git command not found. Please ensure Git is installed", original_exception=e)
-    except Exception as e:
-        raise GitOperationError(f"Unexpected error checking git status for {path_to_check}", 
-                               git_command="git rev-parse", original_exception=e)
+        ref = head[len('ref:'):].strip()
+        ref_path = os.path.join(git_dir, ref)
+        if os.path.isfile(ref_path):
+            with open(ref_path, encoding='utf-8') as f:
+                sha = f.read().strip()
+            return sha if COMMIT_SHA_RE.fullmatch(sha) else None
+        
+        with open(os.path.join(git_dir, 'packed-refs'), encoding='utf-8') as f:
+            for line in f:
+                sha, _, name = line.rstrip('\n').partition(' ')
+                if name == ref and COMMIT_SHA_RE.fullmatch(sha):
+                    return sha
+    except OSError:
+        return None
+    return None
+
+def _read_origin_url(repo_path):
+    """Read remote.origin.url straight from .git/config, or None if it isn't there.
+
+    Only handles the plain `url = ...` form; anything fancier (quoted values,
+    includes, worktrees sharing a common config) is left to `git config`.
+    """
+    git_dir = _git_dir(repo_path)
+    if git_dir is None:
+        return None
+    config_path = os.path.join(git_dir, 'config')
+    try:
+        stat = os.stat(config_path)
+    except OSError:
+        return None
+    return _parse_origin_url(config_path, stat.st_mtime_ns, stat.st_size)
+
+@lru_cache(maxsize=512)
+def _parse_origin_url(config_path, mtime_ns, size):
+    """Parse the origin URL out of a git config file.
+
+    The stat tuple (mtime_ns, size) is part of the cache key so an edited
+    config is parsed again.
+    """
+    try:
+        with open(config_path, encoding='utf-8', errors='replace') as f:
+            in_origin = False
+            for raw_line in f:
+                line = raw_line.strip()
+                if line.startswith('['):
+                    in_origin = ORIGIN_SECTION_RE.match(line) is not None
+                    continue
+                if not in_origin:
+                    continue
+                key, sep, value = line.partition('=')
+                if sep and key.strip().lower() == 'url':
+                    value = value.strip()
+                    # Quoting, escapes and trailing comments are left to git
+                    if not value or any(c in value for c in '"\\#;'):
+                        return None
+                    return value
+    except OSError:
+        return None
+    return None
+
+@safe_operation(default_return=None)
+def get_repo_head(repo_path):
+    """Get the commit SHA checked out in a repository, or None if it can't be read."""
+    head = _read_head_sha(repo_path)
+    if head:
+        return head
+    
+    # Fall back to git for layouts _read_head_sha doesn't handle
+    result = subprocess.run(
+        ['git', '-C', repo_path, 'rev-parse', 'HEAD'],
+        capture_output=True, text=True, check=True, timeout=10
+    )
+    return result.stdout.strip()
 
 @with_error_handling("get_origin_url", "repository_manager")
 def get_repo_origin_url(repo_path):
     """Get the remote origin URL of a git repository."""
     if not repo_path:
         raise ValidationError("Repository path cannot be empty", field="repo_path")
-    
+
+    origin_url = _read_origin_url(repo_path)
+    if origin_url:
+        return origin_url
+
     try:
-        # Run git command to get the remote origin URL
+        # Fall back to git itself when the config couldn't be parsed
         result = subprocess.run(
             ['git', '-C', repo_path, 'config', '--get', 'remote.origin.url'],
             capture_output=True, text=True, check=True, timeout=10
@@ -186,54 +514,90 @@ def pull_repository(repo_path):
         if not os.path.isdir(os.path.join(repo_path, '.git')):
             raise GitOperationError(f"Not a valid git repository: {repo_path}", git_command="git pull")
         
-        # Run git pull
+        # Fetch only the remote's tip and move onto it, keeping shallow clones shallow
+        # (a plain pull would have to reconcile history the clone doesn't have)
         try:
-            result = subprocess.run(
-                ['git', '-C', repo_path, 'pull'],
-                capture_output=True, text=True, timeout=30
-            )
-            
-            if result.returncode == 0:
-                # Update the modification time of the directory after a successful pull
-                current_time = datetime.now().timestamp()
-                os.utime(repo_path, (current_time, current_time))
-                
-                return {
-                    "success": True,
-                    "message": "Successfully pulled latest changes",
-                    "details": sanitize_for_llm(result.stdout.strip())
-                }
-            else:
-                raise GitOperationError(
-                    f"Git pull failed with return code {result.returncode}",
-                    git_command="git pull",
-                    context=ErrorContext("pull_repository", "git_operations", 
-                                        additional_data={"stderr": result.stderr.strip()})
+            for command in (['fetch', *SHALLOW_FETCH_ARGS], ['reset', '--hard', 'FETCH_HEAD']):
+                # Only stderr is needed for errors, plus reset's one-line summary on stdout;
+                # fetch's stdout is discarded rather than buffered
+                result = subprocess.run(
+                    ['git', '-C', repo_path, *command],
+                    stdin=subprocess.DEVNULL,
+                    stdout=subprocess.PIPE if command[0] == 'reset' else subprocess.DEVNULL,
+                    stderr=subprocess.PIPE, text=True, timeout=30
                 )
+                if result.returncode != 0:
+                    raise GitOperationError(
+                        f"Git {command[0]} failed with return code {result.returncode}",
+                        git_command=f"git {command[0]}",
+                        context=ErrorContext("pull_repository", "git_operations", 
+                                            additional_data={"stderr": result.stderr.strip()})
+                    )
+            
+            # Update the modification time of the directory after a successful pull
+            current_time = datetime.now().timestamp()
+            os.utime(repo_path, (current_time, current_time))
+            mark_clone_refreshed(repo_path)
+            
+            return {
+                "success": True,
+                "message": "Successfully pulled latest changes",
+                "details": sanitize_for_llm(result.stdout.strip())
+            }
                 
         except subprocess.TimeoutExpired as e:
             raise GitOperationError("Git pull operation timed out", 
                                    git_command="git pull", original_exception=e)
 
 def get_full_origin_url():
-    """Get the full origin URL including protocol and hostname."""
+    """Get the full origin URL including protocol and hostname, computed once per request."""
+    if 'full_origin_url' in g:
+        return g.full_origin_url
     
     # Check for X-Forwarded-Proto and X-Forwarded-Host headers (used by proxies and Cloudflare)
     proto = request.headers.get('X-Forwarded-Proto') or request.scheme
     host = request.headers.get('X-Forwarded-Host') or request.headers.get('Host') or request.host
     
     # Build and return the full origin URL
-    return f"{proto}://{host}"
+    g.full_origin_url = f"{proto}://{host}"
+    return g.full_origin_url
+
+def validate_repo_name(repo_name, field="repo_name"):
+    """Reject repository names that could escape BASE_REPO_PATH."""
+    if not repo_name or not REPO_NAME_RE.fullmatch(repo_name):
+        raise ValidationError(f"Invalid repository name: {repo_name!r}", field=field)
+
+def repo_name_from_url(repo_url):
+    """Derive the local directory name for a clone URL.
+
+    Every spelling of the same repository (trailing slash, .git suffix, https or
+    scp-style ssh) maps to one name, and the owner is kept so that repositories
+    with the same name under different owners don't share a clone:
+    git@github.com:foo/bar.git and https://github.com/foo/bar/ are both foo__bar.
+    """
+    if '://' in repo_url:
+        path = urlsplit(repo_url).path
+    else:
+        # scp-style user@host:path
+        path = repo_url.split(':', 1)[-1]
+    path = path.strip('/')
+    if path.endswith('.git'):
+        path = path[:-4]
+    return '__'.join(part for part in path.split('/') if part)
 
 @with_error_handling("clone_repository", "repository_manager", RetryConfig(max_attempts=2))
-def clone_repository(repo_url):
-    """Clone the repository if it doesn't exist or return the path to an existing local repository."""
+def clone_repository(repo_url, progress=None):
+    """Clone the repository if it doesn't exist or return the path to an existing local repository.
+
+    If progress is given, it is called with each progress line git prints
+    while a new clone is being made.
+    """
     if not repo_url:
         raise ValidationError("Repository URL cannot be empty", field="repo_url")
     
     # First check if this is a name of an existing local repository
     local_repo_path = os.path.join(BASE_REPO_PATH, repo_url)
-    if os.path.isdir(local_repo_path):
+    if REPO_NAME_RE.fullmatch(repo_url) and os.path.isdir(local_repo_path):
         app.logger.info(f"Using existing local repository: {local_repo_path}")
         if is_valid_git_repo(local_repo_path):
             return local_repo_path
@@ -241,87 +605,278 @@ def clone_repository(repo_url):
             raise GitOperationError(f"Directory exists but is not a valid git repository: {local_repo_path}", 
                                    git_command="git check")
     
-    # If not a local repository, validate it's a proper git URL
-    if not repo_url.startswith(('http://', 'https://', 'git@')):
-        raise ValidationError("Invalid repository URL format. Must be a valid git URL (http://, https://, git@) or an existing local repository name.", 
+    # If not a local repository, validate it's a proper git URL before forking git
+    if not REPO_URL_RE.fullmatch(repo_url):
+        raise ValidationError("Invalid repository URL format. Must be a valid git URL (http://, https://, git://, ssh://, git@) or an existing local repository name.", 
                              field="repo_url")
     
-    repo_name = os.path.basename(repo_url)
-    if repo_name.endswith('.git'):
-        repo_name = repo_name[:-4]
+    repo_name = repo_name_from_url(repo_url)
+    validate_repo_name(repo_name, field="repo_url")
     
     repo_path = os.path.join(BASE_REPO_PATH, repo_name)
     
-    if not os.path.isdir(repo_path):
-        with error_context("clone_repository", "git_operations", repo_url=repo_url):
-            app.logger.info(f"Cloning repository: {repo_url}")
-            ensure_dir_exists(os.path.dirname(repo_path))
+    # Concurrent requests for the same repository wait here rather than racing
+    # each other's clone or fetch into the same directory
+    with _repo_lock(repo_path):
+        if not os.path.isdir(repo_path):
+            with error_context("clone_repository", "git_operations", repo_url=repo_url):
+                app.logger.info(f"Cloning repository: {repo_url}")
+                ensure_dir_exists(os.path.dirname(repo_path))
             
-            try:
-                result = subprocess.run(
-                    ['git', 'clone', repo_url, repo_path], 
-                    check=True, capture_output=True, text=True, timeout=120
-                )
-            except subprocess.CalledProcessError as e:
-                raise GitOperationError(
-                    f"Failed to clone repository {repo_url}",
-                    git_command="git clone",
-                    original_exception=e,
-                    context=ErrorContext("clone_repository", "git_operations", 
-                                        additional_data={"stderr": e.stderr})
-                )
-            except subprocess.TimeoutExpired as e:
-                raise GitOperationError(
-                    f"Git clone operation timed out for {repo_url}",
-                    git_command="git clone",
-                    original_exception=e
-                )
+                try:
+                    try:
+                        # Only the working tree is scanned, so skip history and fetch blobs lazily
+                        _run_git_clone(['--filter=blob:none', repo_url, repo_path], progress)
+                    except subprocess.CalledProcessError as e:
+                        # Some servers don't support partial clone; retry as a plain shallow clone
+                        app.logger.warning(f"Partial clone failed for {repo_url}, retrying without --filter: {e.stderr}")
+                        _run_git_clone([repo_url, repo_path], progress)
+                except subprocess.CalledProcessError as e:
+                    raise GitOperationError(
+                        f"Failed to clone repository {repo_url}",
+                        git_command="git clone",
+                        original_exception=e,
+                        context=ErrorContext("clone_repository", "git_operations", 
+                                            additional_data={"stderr": e.stderr})
+                    )
+                except subprocess.TimeoutExpired as e:
+                    raise GitOperationError(
+                        f"Git clone operation timed out for {repo_url}",
+                        git_command="git clone",
+                        original_exception=e
+                    )
+            mark_clone_refreshed(repo_path)
+        else:
+            refresh_clone(repo_path)
     
     return repo_path
 
-@with_error_handling("git_ignore_check", "file_processor")
-def is_git_ignored(repo_path, file_path):
-    """Check if a file is ignored by git."""
-    if not repo_path or not file_path:
+def _run_git_clone(args, progress=None):
+    """Run a shallow `git clone` with args, raising CalledProcessError or TimeoutExpired like subprocess.run.
+
+    Without a progress callback git runs quietly. With one, git is asked for
+    progress output and each line (git separates updates with \\r) is passed
+    to progress as it arrives.
+    """
+    if progress is None:
+        subprocess.run(['git', 'clone', *SHALLOW_CLONE_ARGS, *args],
+                       check=True, text=True, timeout=CLONE_TIMEOUT, **GIT_QUIET_IO)
+        return
+    
+    command = ['git', 'clone', '--progress', *(a for a in SHALLOW_CLONE_ARGS if a != '--quiet'), *args]
+    process = subprocess.Popen(command, stdin=subprocess.DEVNULL, stdout=subprocess.DEVNULL,
+                               stderr=subprocess.PIPE)
+    # Reading stderr blocks, so enforce the timeout by killing git from a timer
+    timed_out = threading.Event()
+    def kill():
+        timed_out.set()
+        process.kill()
+    timer = threading.Timer(CLONE_TIMEOUT, kill)
+    timer.start()
+    # Keep the tail of the output for the error message
+    output = deque(maxlen=20)
+    try:
+        pending = b''
+        while chunk := process.stderr.read1(4096):
+            pending += chunk
+            *lines, pending = re.split(rb'[\r\n]', pending)
+            for line in lines:
+                if line.strip():
+                    text = line.decode('utf-8', errors='replace').strip()
+                    output.append(text)
+                    progress(text)
+        if pending.strip():
+            output.append(pending.decode('utf-8', errors='replace').strip())
+        returncode = process.wait()
+    finally:
+        timer.cancel()
+        process.stderr.close()
+        # If relaying progress failed part way, don't leave git running unattended
+        if process.poll() is None:
+            process.kill()
+            process.wait()
+    
+    if timed_out.is_set():
+        raise subprocess.TimeoutExpired(command, CLONE_TIMEOUT)
+    if returncode != 0:
+        raise subprocess.CalledProcessError(returncode, command, stderr='\n'.join(output))
+
+def _repo_lock(repo_path):
+    """Return the lock that serializes clones and refreshes of one repository path."""
+    with _repo_locks_lock:
+        lock = _repo_locks.get(repo_path)
+        if lock is None:
+            lock = _repo_locks[repo_path] = threading.Lock()
+        return lock
+
+def mark_clone_refreshed(repo_path):
+    """Record that a clone matches its remote as of now, deferring the next refresh_clone."""
+    with _clone_refresh_lock:
+        _clone_refreshed_at[repo_path] = time.monotonic()
+
+def refresh_clone(repo_path):
+    """Update an existing clone to the remote's HEAD, at most once per CLONE_REFRESH_INTERVAL.
+
+    Fetches only the tip commit and hard-resets onto it, which keeps the clone
+    shallow. A moved HEAD invalidates the scan cache in iter_todos. If the
+    remote can't be reached the existing checkout is scanned as-is.
+    """
+    now = time.monotonic()
+    with _clone_refresh_lock:
+        refreshed_at = _clone_refreshed_at.get(repo_path)
+        if refreshed_at is not None and now - refreshed_at < CLONE_REFRESH_INTERVAL:
+            return
+        _clone_refreshed_at[repo_path] = now
+    
+    try:
+        subprocess.run(
+            ['git', '-C', repo_path, 'fetch', *SHALLOW_FETCH_ARGS],
+            check=True, text=True, timeout=60, **GIT_QUIET_IO
+        )
+        subprocess.run(
+            ['git', '-C', repo_path, 'reset', '--hard', 'FETCH_HEAD'],
+            check=True, text=True, timeout=30, **GIT_QUIET_IO
+        )
+    except (subprocess.CalledProcessError, subprocess.TimeoutExpired) as e:
+        app.logger.warning(f"Could not refresh {repo_path}, scanning the existing checkout: {e}")
+
+@lru_cache(maxsize=1024)
+def _text_type_from_ext(ext):
+    """Classify a lowercased file extension: True for text, False for binary, None if unknown."""
+    # Settle well-known formats before asking mimetypes
+    if ext in BINARY_EXTS:
         return False
-        
+    if ext in TEXT_EXTS:
+        return True
+    
+    mime_type = mimetypes.guess_type('file' + ext)[0]
+    if mime_type is None:
+        return None
+    return mime_type.startswith('text/')
+
+def _text_type_from_name(file_path):
+    """Classify a file from its name alone: True for text, False for binary, None if unknown."""
+    return _text_type_from_ext(os.path.splitext(file_path)[1].lower())
+
+def _looks_like_text(chunk):
+    """Classify leading file bytes as text instead of forking `file`."""
+    if not chunk or b'\x00' in chunk:
+        return False
+
+    try:
+        # A multi-byte sequence may be cut at the chunk boundary, so decode incrementally
+        codecs.getincrementaldecoder('utf-8')().decode(chunk, final=False)
+        return True
+    except UnicodeDecodeError:
+        pass
+
+    non_printable = len(chunk.translate(None, TEXT_PRINTABLE_BYTES))
+    return non_printable / len(chunk) < 0.10
+
+@lru_cache(maxsize=4096)
+def _sniff_is_text(file_path, mtime_ns, size):
+    """Sniff a file's first TEXT_SNIFF_BYTES to decide whether it is text.
+
+    The stat tuple (mtime_ns, size) is part of the cache key so edited files
+    are re-sniffed.
+    """
+    with open(file_path, 'rb') as f:
+        return _looks_like_text(f.read(TEXT_SNIFF_BYTES))
+
+def git_ignored_paths(repo_path, rel_paths):
+    """Return the subset of rel_paths that git ignores, using one `git check-ignore --stdin`.
+
+    Returns None when repo_path isn't inside a git work tree or git isn't
+    available, so the caller can fall back to gitignore_matched_paths.
+    """
+    if not rel_paths:
+        return set()
+    
     try:
-        # Convert to relative path if absolute
-        if os.path.isabs(file_path):
-            file_path = os.path.relpath(file_path, repo_path)
-            
-        # Use git check-ignore to determine if the file is ignored
         result = subprocess.run(
-            ['git', '-C', repo_path, 'check-ignore', '-q', file_path],
-            capture_output=True, timeout=5
+            ['git', '-C', repo_path, 'check-ignore', '--stdin', '-z'],
+            input=b'\0'.join(path.encode('utf-8', errors='surrogateescape') for path in rel_paths) + b'\0',
+            capture_output=True, timeout=60
         )
-        # Return code 0 means the file is ignored
-        return result.returncode == 0
-    except subprocess.TimeoutExpired:
-        app.logger.warning(f"Timeout checking git ignore status for {file_path}")
-        return False
-    except Exception as e:
-        raise ProcessingError(f"Error checking if file is ignored: {file_path}", original_exception=e)
+    except (FileNotFoundError, subprocess.TimeoutExpired) as e:
+        app.logger.warning(f"Could not check ignored files in {repo_path}: {e}")
+        return None
+    
+    # Exit status 1 means nothing is ignored; anything else means git couldn't check
+    if result.returncode == 1:
+        return set()
+    if result.returncode != 0:
+        return None
+    return {path.decode('utf-8', errors='surrogateescape') for path in result.stdout.split(b'\0') if path}
+
+def _load_gitignore(path):
+    """Compile the .gitignore file at path, or return None if it can't be read."""
+    try:
+        with open(path, encoding='utf-8', errors='replace') as f:
+            return pathspec.GitIgnoreSpec.from_lines(f)
+    except OSError as e:
+        app.logger.warning(f"Could not read {path}: {e}")
+        return None
+
+def _gitignore_excludes(specs, rel_path):
+    """Apply (directory, spec) pairs, shallowest first, to rel_path; the last decision wins.
+
+    Directory paths should end in '/' so directory-only patterns apply to them.
+    """
+    excluded = False
+    for directory, spec in specs:
+        if directory:
+            if not rel_path.startswith(directory + '/'):
+                continue
+            path_in_dir = rel_path[len(directory) + 1:]
+        else:
+            path_in_dir = rel_path
+        include = spec.check_file(path_in_dir).include
+        if include is not None:
+            excluded = include
+    return excluded
+
+def gitignore_matched_paths(repo_path, rel_paths):
+    """Return the subset of rel_paths excluded by .gitignore files, matched in-process.
+
+    Used when git itself can't answer (repo_path isn't a work tree, or git is
+    missing). Each .gitignore applies to paths below its own directory, and a
+    deeper file's decision overrides a shallower one's, as in git. Returns an
+    empty set when pathspec isn't installed.
+    """
+    if pathspec is None:
+        return set()
+    
+    specs = {}
+    for rel_path in rel_paths:
+        if os.path.basename(rel_path) != '.gitignore':
+            continue
+        spec = _load_gitignore(os.path.join(repo_path, rel_path))
+        if spec is not None:
+            specs[os.path.dirname(rel_path)] = spec
+    if not specs:
+        return set()
+    
+    # Shallowest directories first, so later (deeper) decisions win
+    ordered = sorted(specs.items(), key=lambda item: item[0].count('/') + bool(item[0]))
+    return {rel_path for rel_path in rel_paths if _gitignore_excludes(ordered, rel_path)}
 
 @with_error_handling("file_type_check", "file_processor")
 def is_text_file(file_path):
-    """Check if a file is a text file using the file command."""
-    if not file_path or not os.path.exists(file_path):
+    """Check if a file is a text file using its extension or a content sniff."""
+    if not file_path:
         return False
-        
+    
     try:
-        mime_type = mimetypes.guess_type(file_path)[0]
-        if mime_type is None:
-            # If mime type can't be guessed from extension, use file command
-            result = subprocess.run(
-                ['file', '--brief', '--mime', file_path], 
-                capture_output=True, text=True, check=True, timeout=5
-            )
-            return result.stdout.strip().startswith('text/')
-        return mime_type.startswith('text/')
-    except subprocess.TimeoutExpired:
-        app.logger.warning(f"Timeout checking file type for {file_path}")
-        return False
+        text_by_name = _text_type_from_name(file_path)
+        if text_by_name is False or not os.path.exists(file_path):
+            return False
+        
+        if text_by_name is None:
+            # If the type can't be guessed from the name, sniff the content
+            stat = os.stat(file_path)
+            return _sniff_is_text(file_path, stat.st_mtime_ns, stat.st_size)
+        return True
     except Exception as e:
         raise ProcessingError(f"Error checking file type: {file_path}", original_exception=e)
 
@@ -330,9 +885,51 @@ def safe_list_local_repositories():
     """Safe wrapper for list_local_repositories that won't crash the app"""
     return list_local_repositories()
 
+def _probe_repo(item, mtime_ns):
+    """Describe one entry of BASE_REPO_PATH, or return None if it isn't a usable repository.
+
+    mtime_ns comes from the scandir pass in list_local_repositories, so the
+    directory isn't stat'ed again here.
+    """
+    full_path = os.path.join(BASE_REPO_PATH, item)
+    app.logger.info(f"Processing item: {item} at full_path: {full_path}")
+
+    try:
+        if not is_valid_git_repo(full_path):
+            app.logger.info(f"Skipping {item} at {full_path} as it's not identified as a valid git repo.")
+            return None
+        app.logger.info(f"Item {item} at {full_path} is identified as a valid git repo.")
+        
+        last_modified = mtime_ns / 1e9
+        try:
+            origin_url = get_repo_origin_url(full_path)
+        except Exception as e:
+            app.logger.warning(f"Error getting metadata for {item}: {e}")
+            return None
+        
+        app.logger.info(f"Origin URL for {item}: {origin_url}")
+    except Exception as e:
+        app.logger.warning(f"Error processing repository {item}: {e}")
+        return None
+
+    app.logger.info(f"Added {item} to repositories list.")
+    return {
+        'name': item,
+        'path': full_path,
+        'last_modified': last_modified,
+        'last_modified_str': time.strftime('%Y-%m-%d %H:%M:%S', time.localtime(last_modified)),
+        'origin_url': origin_url or ""
+    }
+
 @with_error_handling("list_repositories", "repository_manager")
 def list_local_repositories():
-    """List all local repositories that have been cloned."""
+    """List all local repositories that have been cloned.
+
+    The result is cached against the name and mtime of every entry in
+    BASE_REPO_PATH, so clones, deletions and pulls (which touch the repository
+    directory) show up on the next call; REPO_LIST_CACHE_TTL bounds how long
+    anything else, such as a changed origin URL, can stay stale.
+    """
     repos = []
     
     with error_context("list_repositories", "repository_manager", base_path=BASE_REPO_PATH):
@@ -341,102 +938,508 @@ def list_local_repositories():
         ensure_dir_exists(BASE_REPO_PATH)
         
         try:
-            items_in_base_path = os.listdir(BASE_REPO_PATH)
+            with os.scandir(BASE_REPO_PATH) as entries:
+                # DirEntry caches is_dir() and stat(), so this is the only stat per entry
+                signature = tuple(sorted(
+                    (entry.name, entry.stat().st_mtime_ns, entry.is_dir()) for entry in entries
+                ))
         except OSError as e:
             raise FileSystemError(f"Cannot access repository directory {BASE_REPO_PATH}", 
                                  path=BASE_REPO_PATH, original_exception=e)
         
+        cache_key = (BASE_REPO_PATH, signature)
+        with _repo_list_cache_lock:
+            cached = _repo_list_cache.get(cache_key)
+            if cached is not None and time.monotonic() - cached[0] < REPO_LIST_CACHE_TTL:
+                return list(cached[1])
+        
+        items_in_base_path = [name for name, _, _ in signature]
         app.logger.info(f"Items found in BASE_REPO_PATH: {items_in_base_path}")
+        directories = [(name, mtime_ns) for name, mtime_ns, is_dir in signature if is_dir]
 
-        for item in items_in_base_path:
-            full_path = os.path.join(BASE_REPO_PATH, item)
-            app.logger.info(f"Processing item: {item} at full_path: {full_path}")
-
-            try:
-                if is_valid_git_repo(full_path):
-                    app.logger.info(f"Item {item} at {full_path} is identified as a valid git repo.")
-                    
-                    try:
-                        last_modified = os.path.getmtime(full_path)
-                        origin_url = get_repo_origin_url(full_path)
-                    except Exception as e:
-                        app.logger.warning(f"Error getting metadata for {item}: {e}")
-                        continue
-                    
-                    app.logger.info(f"Origin URL for {item}: {origin_url}")
-                    
-                    repos.append({
-                        'name': item,
-                        'path': full_path,
-                        'last_modified': last_modified,
-                        'last_modified_str': datetime.fromtimestamp(last_modified).strftime('%Y-%m-%d %H:%M:%S'),
-                        'origin_url': origin_url or ""
-                    })
-                    app.logger.info(f"Added {item} to repositories list.")
-                else:
-                    app.logger.info(f"Skipping {item} at {full_path} as it's not identified as a valid git repo.")
-            except Exception as e:
-                app.logger.warning(f"Error processing repository {item}: {e}")
-                continue
+        # Each probe is a couple of stats and a small file read; run them concurrently
+        # (app.logger is thread-safe)
+        if directories:
+            with ThreadPoolExecutor(max_workers=min(32, len(directories))) as executor:
+                repos = [repo for repo in executor.map(lambda entry: _probe_repo(*entry), directories) if repo]
         
         repos.sort(key=lambda x: x['last_modified'], reverse=True)
+        
+        with _repo_list_cache_lock:
+            # Only the latest listing is worth keeping
+            _repo_list_cache.clear()
+            _repo_list_cache[cache_key] = (time.monotonic(), repos)
     
     app.logger.info(f"Final list of repository names to be returned: {[repo['name'] for repo in repos]}")
-    return repos
+    return list(repos)
+
+if hyperscan is not None:
+    _todo_hyperscan_db = hyperscan.Database()
+    _todo_hyperscan_db.compile(
+        expressions=[TODO_HYPERSCAN_PATTERN],
+        ids=[0],
+        elements=1,
+        flags=[hyperscan.HS_FLAG_CASELESS | hyperscan.HS_FLAG_SOM_LEFTMOST]
+    )
+    # Scratch space can't be shared between concurrent scans, so keep one per thread
+    _hyperscan_scratch = threading.local()
+
+def _first_keyword_offset(buf):
+    """Return the offset of the window holding the first TODO keyword, or -1 if there is none.
+
+    Lowercases NEWLINE_COUNT_WINDOW bytes at a time and checks them with plain
+    substring searches, which is much cheaper than running the full pattern
+    over files that can't match. Windows overlap so a keyword split across a
+    boundary is still seen.
+    """
+    overlap = max(len(keyword) for keyword in TODO_KEYWORDS) - 1
+    for pos in range(0, len(buf), NEWLINE_COUNT_WINDOW):
+        window = buf[pos:pos + NEWLINE_COUNT_WINDOW + overlap].lower()
+        if any(keyword in window for keyword in TODO_KEYWORDS):
+            return pos
+    return -1
+
+def _todo_match_starts(buf, pos=0):
+    """Return the start offsets of TODO matches in buf[pos:], in ascending order."""
+    if hyperscan is None:
+        return [match.start() for match in TODO_RE_BYTES.finditer(buf, pos)]
+    
+    scratch = getattr(_hyperscan_scratch, 'scratch', None)
+    if scratch is None:
+        scratch = _hyperscan_scratch.scratch = hyperscan.Scratch(_todo_hyperscan_db)
+    
+    starts = []
+    def on_match(expression_id, start, end, flags, context):
+        starts.append(pos + start)
+    _todo_hyperscan_db.scan(memoryview(buf)[pos:], match_event_handler=on_match, scratch=scratch)
+    # Matches are reported by end offset and may repeat, so order and dedupe them
+    return sorted(set(starts))
+
+def _iter_repo_files(repo_path):
+    """Yield (file_path, rel_path) for every regular file under repo_path outside SKIP_DIRS.
+
+    Uses an explicit os.scandir stack so DirEntry's cached type information
+    replaces per-entry stat calls, and relative paths are sliced off the
+    entry path instead of recomputed with os.path.relpath. When pathspec is
+    installed, directories excluded by a .gitignore are pruned rather than
+    walked; git never looks inside an excluded directory either.
+    """
+    prefix_len = len(os.path.join(repo_path, ''))
+    # Each entry carries the (directory, spec) pairs of the .gitignore files above it
+    stack = [(repo_path, ())]
+    while stack:
+        dir_path, specs = stack.pop()
+        with os.scandir(dir_path) as scanned:
+            entries = list(scanned)
+        
+        if pathspec is not None:
+            for entry in entries:
+                if entry.name == '.gitignore' and entry.is_file(follow_symlinks=False):
+                    spec = _load_gitignore(entry.path)
+                    if spec is not None:
+                        specs += ((dir_path[prefix_len:], spec),)
+                    break
+        
+        for entry in entries:
+            if entry.is_dir(follow_symlinks=False):
+                if entry.name in SKIP_DIRS:
+                    continue
+                if specs and _gitignore_excludes(specs, entry.path[prefix_len:] + '/'):
+                    continue
+                stack.append((entry.path, specs))
+            elif entry.is_file(follow_symlinks=False):
+                # Symlinks are skipped, as git grep does, so a link can't pull
+                # files from outside the repository into the scan
+                yield entry.path, entry.path[prefix_len:]
+
+def _count_newlines(buf, start, end):
+    """Count newlines in buf[start:end] while copying at most NEWLINE_COUNT_WINDOW bytes at a time."""
+    count = 0
+    for pos in range(start, end, NEWLINE_COUNT_WINDOW):
+        count += buf[pos:min(pos + NEWLINE_COUNT_WINDOW, end)].count(b'\n')
+    return count
+
+def _scan_file(repo_path, file_path, rel_path):
+    """Scan a single file for TODO comments and return the matches as a list."""
+    
+    try:
+        # Decide from the name alone where possible; unknown types are sniffed
+        # from the mapping below so each file is only opened once
+        text_by_name = _text_type_from_name(file_path)
+        if text_by_name is False:
+            return []
+        
+        todos = []
+        with open(file_path, 'rb') as f:
+            if os.fstat(f.fileno()).st_size == 0:
+                return []
+            buf = mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ)
+        
+        with buf:
+            if text_by_name is None and not _looks_like_text(buf[:TEXT_SNIFF_BYTES]):
+                return []
+            
+            app.logger.info(f"Processing file: {rel_path}")
+            
+            if MMAP_WILLNEED is not None:
+                # Queue readahead for the whole file now rather than faulting it in page by page
+                buf.madvise(MMAP_WILLNEED)
+            # Skip the pattern entirely for files that never mention a keyword, and
+            # otherwise start matching from the line where the first one appears
+            keyword_offset = _first_keyword_offset(buf)
+            if keyword_offset == -1:
+                return []
+            scan_from = buf.rfind(b'\n', 0, keyword_offset) + 1
+            
+            line_num = 1
+            counted_to = 0
+            last_line_start = -1
+            for start in _todo_match_starts(buf, scan_from):
+                line_start = buf.rfind(b'\n', 0, start) + 1
+                # Only report each line once, as the line-based scan did
+                if line_start == last_line_start:
+                    continue
+                last_line_start = line_start
+                
+                # Count newlines incrementally so line numbers cost O(file size) overall
+                line_num += _count_newlines(buf, counted_to, line_start)
+                counted_to = line_start
+                
+                line_end = buf.find(b'\n', start)
+                if line_end == -1:
+                    line_end = len(buf)
+                todo_text = buf[line_start:line_end].decode('utf-8', errors='ignore').strip()
+                
+                next_line_text = None
+                if line_end + 1 < len(buf):
+                    next_end = buf.find(b'\n', line_end + 1)
+                    if next_end == -1:
+                        next_end = len(buf)
+                    next_line_text = buf[line_end + 1:next_end].decode('utf-8', errors='ignore').strip()
+                
+                todos.append(TodoItem(rel_path, line_num, todo_text, next_line_text))
+        return todos
+                
+    except ProcessingError:
+        # Re-raise processing errors
+        raise
+    except Exception as e:
+        # Convert other exceptions to ProcessingError
+        raise ProcessingError(f"Error processing file {rel_path}", original_exception=e)
+
+def _git_grep_todos(repo_path):
+    """Yield TodoItems found by a single `git grep` over the work tree.
+
+    git handles .gitignore rules (--untracked honours exclude-standard) and
+    binary detection (-I) itself, so no per-file subprocesses are needed.
+    Returns True once git grep has run, or False if it could not be used
+    (git missing, not a work tree) so the caller can fall back to walking.
+    If the consumer stops early, closing stdout makes git exit on SIGPIPE.
+    """
+    try:
+        process = subprocess.Popen(
+            ['git', '-C', repo_path, 'grep', '--untracked', '--no-color', '-I', '-i', '-E',
+             '-n', '-z', '-A1', '-e', GIT_GREP_TODO_PATTERN, '--', '.']
+            + [f':(glob,exclude)**/{d}/**' for d in sorted(SKIP_DIRS)],
+            stdout=subprocess.PIPE, stderr=subprocess.DEVNULL, bufsize=GIT_GREP_BUFFER_SIZE
+        )
+    except FileNotFoundError:
+        return False
+
+    # Records are "path\0line\0text" for both matches and -A1 context lines, so
+    # hold each match until the following record tells us its next line
+    pending = None
+    text_files = {}
+    raw_path = None
+    try:
+        for raw in process.stdout:
+            if raw == b'--\n':
+                continue
+            parts = raw.split(b'\0', 2)
+            if len(parts) != 3:
+                continue
+            # A file's records arrive together; decode its path once so all of
+            # its TodoItems share one string
+            if parts[0] != raw_path:
+                raw_path = parts[0]
+                rel_path = raw_path.decode('utf-8', errors='ignore')
+            line_num = int(parts[1])
+            # Keep the trailing newline while matching, as the line-based scan does
+            line = parts[2].decode('utf-8', errors='ignore')
+
+            if pending is not None:
+                if pending.file_path == rel_path and pending.line_num + 1 == line_num:
+                    pending.next_line = line.strip()
+                yield pending
+                pending = None
+
+            if not TODO_RE.search(line):
+                continue
+
+            # Apply the same file-type filter as the Python walker, once per file
+            if rel_path not in text_files:
+                text_files[rel_path] = is_text_file(os.path.join(repo_path, rel_path))
+            if text_files[rel_path]:
+                pending = TodoItem(rel_path, line_num, line.strip())
+
+        if pending is not None:
+            yield pending
+    finally:
+        process.stdout.close()
+        returncode = process.wait()
+
+    # Exit status 1 just means nothing matched
+    if returncode not in (0, 1):
+        app.logger.debug(f"git grep unavailable for {repo_path} (exit code {returncode})")
+        return False
+    return True
+
+def _scan_file_chunk(repo_path, files):
+    """Scan a run of (file_path, rel_path) pairs in a worker process, in order."""
+    todos = []
+    for file_path, rel_path in files:
+        todos.extend(_scan_file(repo_path, file_path, rel_path))
+    return todos
+
+def _get_scan_process_pool():
+    """Return the shared scan process pool, starting it on first use.
+
+    Workers come from a forkserver where available, since forking this
+    multi-threaded server directly could copy held locks into the child.
+    """
+    global _scan_process_pool
+    with _scan_process_pool_lock:
+        if _scan_process_pool is None:
+            method = 'forkserver' if 'forkserver' in multiprocessing.get_all_start_methods() else 'spawn'
+            _scan_process_pool = ProcessPoolExecutor(
+                max_workers=os.cpu_count() or 1,
+                mp_context=multiprocessing.get_context(method)
+            )
+        return _scan_process_pool
+
+def _scan_files_in_processes(repo_path, files):
+    """Yield TodoItems for files scanned in chunks on the process pool, in traversal order."""
+    global _scan_process_pool
+    pool = _get_scan_process_pool()
+    futures = [
+        pool.submit(_scan_file_chunk, repo_path, files[i:i + PROCESS_SCAN_CHUNK])
+        for i in range(0, len(files), PROCESS_SCAN_CHUNK)
+    ]
+    try:
+        for future in futures:
+            yield from future.result()
+    except BrokenProcessPool:
+        # A worker died; start a fresh pool next time rather than failing every scan
+        with _scan_process_pool_lock:
+            if _scan_process_pool is pool:
+                _scan_process_pool = None
+        raise
+    finally:
+        # The pool is shared, so only drop this scan's outstanding chunks
+        for future in futures:
+            future.cancel()
+
+def _find_all_todos(repo_path):
+    """Yield every TODO in the repository, via git grep or the file walker."""
+    # Fast path: let git search the whole work tree in one process
+    if (yield from _git_grep_todos(repo_path)):
+        return
+    
+    files = list(_iter_repo_files(repo_path))
+    rel_paths = [rel_path for _, rel_path in files]
+    ignored = git_ignored_paths(repo_path, rel_paths)
+    if ignored is None:
+        ignored = gitignore_matched_paths(repo_path, rel_paths)
+    if ignored:
+        files = [paths for paths in files if paths[1] not in ignored]
+    # Scan in path order, as git grep reports matches, so a capped scan keeps the
+    # same TODOs whichever path ran; both executors below preserve this order
+    files.sort(key=lambda paths: paths[1])
+    
+    if len(files) >= PROCESS_SCAN_MIN_FILES:
+        yield from _scan_files_in_processes(repo_path, files)
+        return
+    
+    # Files are scanned concurrently; map() keeps results in traversal order
+    executor = ThreadPoolExecutor(max_workers=SCAN_WORKERS)
+    try:
+        for todos in executor.map(lambda paths: _scan_file(repo_path, *paths), files):
+            # Yield each TodoItem as soon as its file is done instead of accumulating them
+            yield from todos
+    finally:
+        # Drop queued files if the consumer stopped early
+        executor.shutdown(wait=True, cancel_futures=True)
 
 @with_error_handling("find_todos", "file_processor")
-def find_todos(repo_path):
-    """Find TODO comments in all text files in the repository."""
+def find_todos(repo_path, max_results=MAX_TODO_RESULTS, status=None):
+    """Find TODO comments in all text files in the repository, stopping after max_results.
+
+    If status is a dict, status['truncated'] is set once the results are
+    exhausted, telling whether the repository holds more than max_results.
+    """
     if not repo_path:
         raise ValidationError("Repository path cannot be empty", field="repo_path")
     
     if not os.path.isdir(repo_path):
         raise FileSystemError(f"Repository path does not exist: {repo_path}", path=repo_path)
     
-    # Expanded pattern to match more comment styles and annotation types
-    # This includes TODO, FIXME, BUG, and NOTE in various comment formats
-    todo_pattern = re.compile(
-        r'(?:#+|//|/\*|<!--|;)\s*(?:TODO|FIXME|BUG|NOTE)(?:\s*:|(?:\s+))', 
-        re.IGNORECASE
-    )
-    
     with error_context("find_todos", "file_processor", repo_path=repo_path):
-        for root, _, files in os.walk(repo_path):
-            for file in files:
-                if file.startswith('.git'):
-                    continue
-                    
-                file_path = os.path.join(root, file)
-                rel_path = os.path.relpath(file_path, repo_path)
-                
-                try:
-                    # Skip files that are ignored by git
-                    if is_git_ignored(repo_path, file_path):
-                        app.logger.debug(f"Skipping git-ignored file: {rel_path}")
-                        continue
-                        
-                    if not is_text_file(file_path):
-                        continue
-                        
-                    app.logger.info(f"Processing file: {rel_path}")
-                    
-                    with open(file_path, 'r', encoding='utf-8', errors='ignore') as f:
-                        lines = f.readlines()
-                        
-                    for i, line in enumerate(lines):
-                        # Look for expanded TODO patterns
-                        if todo_pattern.search(line):
-                            todo_text = line.strip()
-                            next_line_text = lines[i+1].strip() if i+1 < len(lines) else None
-                            # Yield the TodoItem as it's found instead of accumulating them
-                            yield TodoItem(rel_path, i+1, todo_text, next_line_text)
-                            
-                except ProcessingError:
-                    # Re-raise processing errors
-                    raise
-                except Exception as e:
-                    # Convert other exceptions to ProcessingError
-                    raise ProcessingError(f"Error processing file {rel_path}", original_exception=e)
+        todos = _find_all_todos(repo_path)
+        try:
+            # Look one item past the cap, so a repository with exactly
+            # max_results TODOs isn't reported as truncated
+            truncated = False
+            for index, todo in enumerate(todos):
+                if index == max_results:
+                    truncated = True
+                    break
+                yield todo
+            if status is not None:
+                status['truncated'] = truncated
+        finally:
+            # Stops git grep or the file workers as soon as the cap is reached
+            todos.close()
+
+def _todo_cache_file(repo_path, head):
+    """Path of the on-disk copy of a completed scan."""
+    return os.path.join(BASE_REPO_PATH, TODO_CACHE_DIRNAME, TODO_CACHE_VERSION,
+                        os.path.basename(repo_path), f"{head}.json")
+
+@safe_operation(default_return=None)
+def load_cached_todos(repo_path, head):
+    """Read a scan saved by save_cached_todos as (rows, max_results, truncated), or None if there isn't one."""
+    try:
+        with open(_todo_cache_file(repo_path, head), 'rb') as f:
+            data = f.read()
+    except FileNotFoundError:
+        return None
+    cached = orjson.loads(data) if orjson is not None else json.loads(data)
+    return tuple(tuple(row) for row in cached['todos']), cached['max_results'], cached['truncated']
+
+@safe_operation(default_return=None)
+def save_cached_todos(repo_path, head, rows, max_results, truncated):
+    """Write a scan to disk so other workers and later runs can reuse it.
+
+    Scans of the repository's other HEADs, and everything cached by other
+    scanner versions, are deleted, so the cache holds one file per repository.
+    """
+    path = _todo_cache_file(repo_path, head)
+    repo_cache_dir = os.path.dirname(path)
+    os.makedirs(repo_cache_dir, exist_ok=True)
+    cached = {'max_results': max_results, 'truncated': truncated, 'todos': rows}
+    data = orjson.dumps(cached) if orjson is not None else json.dumps(cached).encode()
+    # Write to a private temp file and rename it into place so readers never see a partial file
+    tmp_path = f"{path}.{os.getpid()}.{threading.get_ident()}.tmp"
+    with open(tmp_path, 'wb') as f:
+        f.write(data)
+    os.replace(tmp_path, path)
+    
+    # Other writers' temp files are left alone; they're renamed or removed by their owners
+    with os.scandir(repo_cache_dir) as entries:
+        for entry in entries:
+            if entry.path != path and not entry.name.endswith('.tmp'):
+                _remove_cache_entry(entry)
+    with os.scandir(os.path.join(BASE_REPO_PATH, TODO_CACHE_DIRNAME)) as entries:
+        for entry in entries:
+            if entry.name != TODO_CACHE_VERSION:
+                _remove_cache_entry(entry)
+
+def _remove_cache_entry(entry):
+    """Delete a stale file or directory from the scan cache, ignoring ones already gone."""
+    try:
+        if entry.is_dir(follow_symlinks=False):
+            shutil.rmtree(entry.path, ignore_errors=True)
+        else:
+            os.unlink(entry.path)
+    except FileNotFoundError:
+        pass
+
+def _covers(cached, max_results):
+    """Whether a cached (rows, max_results, truncated) scan holds the first max_results TODOs."""
+    _, cached_max_results, truncated = cached
+    return not truncated or max_results <= cached_max_results
+
+def iter_todos(repo_path, max_results=MAX_TODO_RESULTS, status=None):
+    """Yield the TODOs in a repository, replaying the previous scan if HEAD hasn't moved.
+
+    Scans are cached under (repo_path, HEAD), so a pull that moves HEAD
+    naturally invalidates them. A scan stops at the caller's max_results and
+    is cached with that cap; it serves later requests for the same or a
+    smaller cap, or any cap if it found every TODO, and a larger cap
+    rescans. Entries are plain tuples, kept in memory and also written under
+    TODO_CACHE_DIRNAME so they survive restarts and are shared between
+    workers. status is filled in as for find_todos.
+    """
+    head = get_repo_head(repo_path)
+    key = (repo_path, head)
+    
+    if head:
+        with _todo_cache_lock:
+            cached = _todo_cache.get(key)
+            if cached is not None:
+                _todo_cache.move_to_end(key)
+        if cached is None or not _covers(cached, max_results):
+            on_disk = load_cached_todos(repo_path, head)
+            if on_disk is not None and _covers(on_disk, max_results):
+                cached = on_disk
+                _remember_todos(key, cached)
+        if cached is not None and _covers(cached, max_results):
+            rows, _, truncated = cached
+            for fields in rows[:max_results]:
+                yield TodoItem(*fields)
+            if status is not None:
+                status['truncated'] = truncated or len(rows) > max_results
+            return
+    
+    scan_status = {}
+    collected = []
+    for todo in find_todos(repo_path, max_results, scan_status):
+        collected.append((todo.file_path, todo.line_num, todo.todo_text, todo.next_line))
+        yield todo
+    truncated = scan_status['truncated']
+    if status is not None:
+        status['truncated'] = truncated
+    
+    if head:
+        _remember_todos(key, (tuple(collected), max_results, truncated))
+        save_cached_todos(repo_path, head, collected, max_results, truncated)
+
+def _remember_todos(key, cached):
+    """Store a scan in the in-memory LRU, evicting the oldest beyond TODO_CACHE_MAX_ROWS."""
+    global _todo_cache_rows
+    with _todo_cache_lock:
+        # Empty scans count as one row, so the number of entries is bounded too
+        previous = _todo_cache.pop(key, None)
+        if previous is not None:
+            _todo_cache_rows -= len(previous[0]) or 1
+        _todo_cache[key] = cached
+        _todo_cache_rows += len(cached[0]) or 1
+        while _todo_cache_rows > TODO_CACHE_MAX_ROWS and len(_todo_cache) > 1:
+            _, evicted = _todo_cache.popitem(last=False)
+            _todo_cache_rows -= len(evicted[0]) or 1
+
+def _clear_todo_cache():
+    """Empty the in-memory scan cache."""
+    global _todo_cache_rows
+    with _todo_cache_lock:
+        _todo_cache.clear()
+        _todo_cache_rows = 0
+
+def parse_max_results(value):
+    """Parse a client-supplied result cap, defaulting to MAX_TODO_RESULTS and capping at MAX_TODO_RESULTS_LIMIT."""
+    if value is None or value == '':
+        return MAX_TODO_RESULTS
+    try:
+        max_results = int(value)
+    except (TypeError, ValueError):
+        raise ValidationError(f"max_results must be an integer, got {value!r}", field="max_results")
+    if max_results < 1:
+        raise ValidationError("max_results must be at least 1", field="max_results")
+    return min(max_results, MAX_TODO_RESULTS_LIMIT)
+
+def scan_todos(repo_path, max_results=MAX_TODO_RESULTS, status=None):
+    """Return up to max_results TODOs in a repository as a list, using the HEAD-keyed scan cache."""
+    return list(iter_todos(repo_path, max_results, status))
 
 @app.route('/', methods=['GET', 'POST'])
 def index():
@@ -452,53 +1455,122 @@ def index():
     
     return render_template('index.html', local_repos=local_repos)
 
+def stream_buffered_template(template_name, **context):
+    """Like stream_template, but groups template output into larger chunks.
+
+    Jinja yields a fragment for every piece of markup and every expression, so a
+    results page would otherwise go out as thousands of tiny writes.
+    """
+    app.update_template_context(context)
+    stream = app.jinja_env.get_template(template_name).stream(context)
+    stream.enable_buffering(TEMPLATE_STREAM_BUFFER)
+    return app.response_class(stream_with_context(stream))
+
 @app.route('/scan/<path:repo_url>')
 def scan_repo(repo_url):
-    """Scan a repository for TODOs."""
+    """Scan a repository for TODOs, streaming the results page as matches are found."""
     try:
+        max_results = parse_max_results(request.args.get('max_results'))
         repo_path = clone_repository(repo_url)
-        todos = list(find_todos(repo_path))
         repo_name = os.path.basename(repo_path)
         
         # Get the repository's origin URL
         origin_url = get_repo_origin_url(repo_path) or repo_url
-        
-        return render_template('results.html', 
-                              repo_url=origin_url,
-                              repo_name=repo_name,
-                              todos=todos,
-                              count=len(todos))
     
     except Exception as e:
         app.logger.error(f"Error scanning repository: {e}")
         return render_template('index.html', error=f"Error scanning repository: {str(e)}")
+    
+    # The page is already being sent by the time a scan error can surface, so
+    # record it for the template to report after the last rendered TODO
+    scan_status = {"error": None, "truncated": False}
+    
+    def todos():
+        try:
+            yield from iter_todos(repo_path, max_results, scan_status)
+        except Exception as e:
+            app.logger.error(f"Error scanning repository: {e}")
+            scan_status["error"] = f"Error scanning repository: {str(e)}"
+    
+    return stream_buffered_template('results.html',
+                                    repo_url=origin_url,
+                                    repo_name=repo_name,
+                                    todos=todos(),
+                                    max_results=max_results,
+                                    scan_status=scan_status)
+
+def sse_event(payload):
+    """Format a payload as a Server-Sent Events data frame."""
+    if orjson is not None:
+        return b'data: ' + orjson.dumps(payload) + b'\n\n'
+    return f"data: {json.dumps(payload)}\n\n"
+
+def ndjson_line(payload):
+    """Format a payload as one line of newline-delimited JSON."""
+    if orjson is not None:
+        return orjson.dumps(payload) + b'\n'
+    return json.dumps(payload) + "\n"
 
 @app.route('/stream_data/<path:repo_url>')
 def stream_data(repo_url):
     """Stream the scan results for a repository."""
     def generate():
         try:
-            repo_path = clone_repository(repo_url)
+            # Clone on a worker thread so git's progress can be relayed while it runs
+            updates = queue.Queue()
+            outcome = {}
+            def clone():
+                try:
+                    # The thread has no app context of its own; without one, errors
+                    # would bypass app.error_handler and its recovery strategies
+                    with app.app_context():
+                        outcome['repo_path'] = clone_repository(repo_url, progress=updates.put)
+                except Exception as e:
+                    outcome['error'] = e
+                finally:
+                    updates.put(None)
+            threading.Thread(target=clone, daemon=True).start()
+            
+            # Percentage updates arrive many times a second; pass them on at most
+            # every CLONE_PROGRESS_INTERVAL, but always send other messages
+            last_sent = 0.0
+            while (line := updates.get()) is not None:
+                now = time.monotonic()
+                if '%' not in line or now - last_sent >= CLONE_PROGRESS_INTERVAL:
+                    last_sent = now
+                    yield sse_event({'type': 'clone_progress', 'line': line})
+            if 'error' in outcome:
+                raise outcome['error']
+            repo_path = outcome['repo_path']
             repo_name = os.path.basename(repo_path)
             origin_url = get_repo_origin_url(repo_path) or repo_url
             
             # Send initial metadata about the repository
-            yield f"data: {json.dumps({'type': 'init', 'repo_name': repo_name, 'repo_url': origin_url})}\n\n"
+            yield sse_event({'type': 'init', 'repo_name': repo_name, 'repo_url': origin_url})
             
             # Counter for todos
             todo_count = 0
             
-            # Stream each TODO as it's found
-            for todo in find_todos(repo_path):
+            # Send TODOs in batches of up to SSE_BATCH_SIZE, flushing early once
+            # SSE_BATCH_INTERVAL has passed so slow scans still show progress
+            batch = []
+            batch_started = time.monotonic()
+            for todo in iter_todos(repo_path):
                 todo_count += 1
-                yield f"data: {json.dumps({'type': 'todo', 'todo': todo.to_dict(), 'count': todo_count})}\n\n"
+                batch.append(todo.to_dict())
+                if len(batch) >= SSE_BATCH_SIZE or time.monotonic() - batch_started >= SSE_BATCH_INTERVAL:
+                    yield sse_event({'type': 'todo_batch', 'todos': batch, 'count': todo_count})
+                    batch = []
+                    batch_started = time.monotonic()
+            if batch:
+                yield sse_event({'type': 'todo_batch', 'todos': batch, 'count': todo_count})
             
             # Send completion event
-            yield f"data: {json.dumps({'type': 'complete', 'count': todo_count})}\n\n"
+            yield sse_event({'type': 'complete', 'count': todo_count})
             
         except Exception as e:
             app.logger.error(f"Error streaming scan: {str(e)}")
-            yield f"data: {json.dumps({'type': 'error', 'message': str(e)})}\n\n"
+            yield sse_event({'type': 'error', 'message': str(e)})
     
     return app.response_class(
         generate(),
@@ -514,6 +1586,7 @@ def scan_stream(repo_url):
 def pull_repo(repo_name):
     """Pull the latest changes for a repository and redirect to the scan page."""
     try:
+        validate_repo_name(repo_name)
         repo_path = os.path.join(BASE_REPO_PATH, repo_name)
         
         # Pull the latest changes
@@ -532,13 +1605,19 @@ def pull_repo(repo_name):
 
 @app.template_filter('highlight_todo')
 def highlight_todo(text):
-    """Highlight the TODO, FIXME, BUG, and NOTE keywords in the text."""
-    return re.sub(
-        r'(#+\s*(TODO|FIXME|BUG|NOTE)|//\s*(TODO|FIXME|BUG|NOTE)|/\*\s*(TODO|FIXME|BUG|NOTE)|<!--\s*(TODO|FIXME|BUG|NOTE)|;\s*(TODO|FIXME|BUG|NOTE)|(TODO|FIXME|BUG|NOTE):)',
-        r'<span class="highlight">\1</span>',
-        text, 
-        flags=re.IGNORECASE
-    )
+    """Highlight the TODO, FIXME, BUG, and NOTE keywords in the text.
+
+    Builds the markup in one pass over the precompiled pattern, escaping the
+    text around each match, and returns Markup so Jinja won't escape it again.
+    """
+    parts = []
+    pos = 0
+    for match in TODO_HIGHLIGHT_RE.finditer(text):
+        parts.append(escape(text[pos:match.start()]))
+        parts.append(HIGHLIGHT_SPAN.format(escape(match.group())))
+        pos = match.end()
+    parts.append(escape(text[pos:]))
+    return Markup(''.join(parts))
 
 # ----- MPCO API Endpoints -----
 
@@ -560,10 +1639,9 @@ def mpco_response(f):
             }), 500
     return decorated_function
 
-@app.route('/api/mpco/manifest', methods=['GET'])
-def mpco_manifest():
-    """Return the MPCO tool manifest."""
-    return jsonify({
+def get_manifest(url_root):
+    """Build the MPCO tool manifest for a server reachable at url_root."""
+    return {
         "schema_version": "v1",
         "name_for_human": "TODO Scanner",
         "name_for_model": "todo_scanner",
@@ -574,12 +1652,20 @@ def mpco_manifest():
         },
         "api": {
             "type": "openapi",
-            "url": f"{request.url_root}api/mpco/openapi.json"
+            "url": f"{url_root}api/mpco/openapi.json"
         }
-    })
+    }
+
+@app.route('/api/mpco/manifest', methods=['GET'])
+def mpco_manifest():
+    """Return the MPCO tool manifest."""
+    return render_json_template(MANIFEST_JSON_TEMPLATE)
 
-def get_api_schema():
+def get_api_schema(url_root=None):
     """Generate the API schema based on actual API endpoints."""
+    if url_root is None:
+        url_root = request.url_root
+    
     # Define the schema for the TodoItem
     todo_item_schema = {
         "type": "object",
@@ -611,7 +1697,7 @@ def get_api_schema():
         },
         "servers": [
             {
-                "url": f"{request.url_root}api"
+                "url": f"{url_root}api"
             }
         ],
         "paths": {}
@@ -706,6 +1792,13 @@ def get_api_schema():
                                 "repo_url": {
                                     "type": "string",
                                     "description": "URL of the git repository to scan (e.g., https://github.com/username/repo.git)"
+                                },
+                                "max_results": {
+                                    "type": "integer",
+                                    "minimum": 1,
+                                    "maximum": MAX_TODO_RESULTS_LIMIT,
+                                    "default": MAX_TODO_RESULTS,
+                                    "description": "Stop scanning after this many TODO items"
                                 }
                             }
                         }
@@ -727,6 +1820,7 @@ def get_api_schema():
                                         "type": "array",
                                         "items": todo_item_schema
                                     },
+                                    "truncated": {"type": "boolean"},
                                     "web_url": {"type": "string"}
                                 }
                             }
@@ -737,6 +1831,68 @@ def get_api_schema():
         }
     }
     
+    # Add scan_repositories batch endpoint
+    spec["paths"]["/scan_repositories"] = {
+        "post": {
+            "operationId": "scanRepositories",
+            "summary": "Scan several git repositories for TODO comments concurrently",
+            "requestBody": {
+                "required": True,
+                "content": {
+                    "application/json": {
+                        "schema": {
+                            "type": "object",
+                            "required": ["repo_urls"],
+                            "properties": {
+                                "repo_urls": {
+                                    "type": "array",
+                                    "items": {"type": "string"},
+                                    "maxItems": MAX_BATCH_REPOSITORIES,
+                                    "description": "URLs of the git repositories to scan"
+                                }
+                            }
+                        }
+                    }
+                }
+            },
+            "responses": {
+                "200": {
+                    "description": "Scan result for each repository, in request order",
+                    "content": {
+                        "application/json": {
+                            "schema": {
+                                "type": "object",
+                                "properties": {
+                                    "results": {
+                                        "type": "array",
+                                        "items": {
+                                            "type": "object",
+                                            "properties": {
+                                                "status": {"type": "string", "enum": ["success", "error"]},
+                                                "repo_url": {"type": "string"},
+                                                "repo_name": {"type": "string"},
+                                                "todo_count": {"type": "integer"},
+                                                "todos": {
+                                                    "type": "array",
+                                                    "items": todo_item_schema
+                                                },
+                                                "truncated": {"type": "boolean"},
+                                                "web_url": {"type": "string"},
+                                                "error": {"type": "string"},
+                                                "error_id": {"type": "string", "nullable": True}
+                                            }
+                                        }
+                                    },
+                                    "count": {"type": "integer"}
+                                }
+                            }
+                        }
+                    }
+                }
+            }
+        }
+    }
+    
     # Add scan_repository_stream endpoint
     spec["paths"]["/scan_repository_stream"] = {
         "post": {
@@ -754,6 +1910,13 @@ def get_api_schema():
                                 "repo_url": {
                                     "type": "string",
                                     "description": "URL of the git repository to scan (e.g., https://github.com/username/repo.git)"
+                                },
+                                "max_results": {
+                                    "type": "integer",
+                                    "minimum": 1,
+                                    "maximum": MAX_TODO_RESULTS_LIMIT,
+                                    "default": MAX_TODO_RESULTS,
+                                    "description": "Stop scanning after this many TODO items"
                                 }
                             }
                         }
@@ -793,6 +1956,7 @@ def get_api_schema():
                                             "type": {"type": "string", "enum": ["complete"]},
                                             "status": {"type": "string", "enum": ["success"]},
                                             "count": {"type": "integer"},
+                                            "truncated": {"type": "boolean"},
                                             "repo_name": {"type": "string"},
                                             "repo_url": {"type": "string"},
                                             "web_url": {"type": "string"}
@@ -829,7 +1993,41 @@ def get_api_schema():
 @app.route('/api/mpco/openapi.json', methods=['GET'])
 def mpco_openapi():
     """Return the OpenAPI specification for the MPCO endpoints."""
-    return jsonify(get_api_schema())
+    return render_json_template(OPENAPI_JSON_TEMPLATE)
+
+# The manifest and OpenAPI documents only vary by the server's URL root, so
+# serialize them once with a placeholder and substitute it per request
+URL_ROOT_PLACEHOLDER = '@@URL_ROOT@@'
+MANIFEST_JSON_TEMPLATE = json.dumps(get_manifest(URL_ROOT_PLACEHOLDER))
+OPENAPI_JSON_TEMPLATE = json.dumps(get_api_schema(URL_ROOT_PLACEHOLDER))
+
+def render_json_template(template):
+    """Return a pre-serialized JSON document with the current request's URL root filled in."""
+    # json.dumps()[1:-1] escapes the URL exactly as it would appear inside a JSON string
+    url_root = json.dumps(request.url_root)[1:-1]
+    return Response(template.replace(URL_ROOT_PLACEHOLDER, url_root), mimetype='application/json')
+
+def scan_repository_result(repo_url, web_base_url, max_results=MAX_TODO_RESULTS):
+    """Clone (if needed) and scan a repository, returning the API result payload."""
+    repo_path = clone_repository(repo_url)
+    scan_status = {}
+    todos = scan_todos(repo_path, max_results, scan_status)
+    repo_name = os.path.basename(repo_path)
+    
+    # Convert TodoItem objects to dictionaries
+    todo_dicts = [todo.to_dict() for todo in todos]
+    
+    # Get original repository URL from git config
+    origin_url = get_repo_origin_url(repo_path) or repo_url
+    
+    return {
+        "repo_url": origin_url,
+        "repo_name": repo_name,
+        "todo_count": len(todos),
+        "todos": todo_dicts,
+        "truncated": scan_status['truncated'],
+        "web_url": f"{web_base_url}/scan/{repo_url}"
+    }
 
 @app.route('/api/mpco/scan_repository', methods=['POST'])
 @mpco_response
@@ -841,33 +2039,58 @@ def api_scan_repository():
         raise ValueError("Repository URL is required")
     
     repo_url = data['repo_url']
+    max_results = parse_max_results(data.get('max_results'))
     
     try:
-        repo_path = clone_repository(repo_url)
-        todos = list(find_todos(repo_path))
-        repo_name = os.path.basename(repo_path)
-        
-        # Convert TodoItem objects to dictionaries
-        todo_dicts = [todo.to_dict() for todo in todos]
-        
-        # Get original repository URL from git config
-        origin_url = get_repo_origin_url(repo_path) or repo_url
-        
-        # Get full server origin URL for web links
-        web_base_url = get_full_origin_url()
-        
-        return {
-            "repo_url": origin_url,
-            "repo_name": repo_name,
-            "todo_count": len(todos),
-            "todos": todo_dicts,
-            "web_url": f"{web_base_url}/scan/{repo_url}"
-        }
+        return scan_repository_result(repo_url, get_full_origin_url(), max_results)
         
     except Exception as e:
         app.logger.error(f"Error in API scan: {str(e)}")
         raise
 
+@app.route('/api/mpco/scan_repositories', methods=['POST'])
+@mpco_response
+def api_scan_repositories():
+    """API endpoint to scan several repositories for TODOs concurrently.
+    
+    Each repository is cloned and scanned on its own worker thread, so slow
+    clones overlap instead of running back to back. A failure in one
+    repository is reported in its entry and doesn't fail the whole batch.
+    """
+    data = request.json
+    
+    if not data or not isinstance(data.get('repo_urls'), list) or not data['repo_urls']:
+        raise ValueError("A non-empty list of repository URLs is required")
+    
+    repo_urls = data['repo_urls']
+    if len(repo_urls) > MAX_BATCH_REPOSITORIES:
+        raise ValueError(f"At most {MAX_BATCH_REPOSITORIES} repositories can be scanned per request")
+    
+    # Resolve the request-bound origin before handing work to other threads
+    web_base_url = get_full_origin_url()
+    
+    def scan_one(repo_url):
+        try:
+            # Pool threads don't inherit the app context, which app.error_handler needs
+            with app.app_context():
+                return {"status": "success", **scan_repository_result(repo_url, web_base_url)}
+        except Exception as e:
+            app.logger.error(f"Error in batch API scan of {repo_url}: {str(e)}")
+            return {
+                "status": "error",
+                "repo_url": repo_url,
+                "error": str(e),
+                "error_id": e.error_id if isinstance(e, ScannerError) else None
+            }
+    
+    with ThreadPoolExecutor(max_workers=min(len(repo_urls), MAX_BATCH_REPOSITORIES)) as executor:
+        results = list(executor.map(scan_one, repo_urls))
+    
+    return {
+        "results": results,
+        "count": len(results)
+    }
+
 @app.route('/api/mpco/list_repositories', methods=['GET'])
 @mpco_response
 def api_list_repositories():
@@ -899,6 +2122,7 @@ def api_pull_repository():
         raise ValueError("Repository name is required")
     
     repo_name = data['repo_name']
+    validate_repo_name(repo_name)
     repo_path = os.path.join(BASE_REPO_PATH, repo_name)
     
     # Pull the latest changes
@@ -911,7 +2135,7 @@ def api_pull_repository():
         result.update({
             "repo_name": repo_name,
             "origin_url": origin_url,
-            "last_modified": datetime.fromtimestamp(last_modified).strftime('%Y-%m-%d %H:%M:%S'),
+            "last_modified": time.strftime('%Y-%m-%d %H:%M:%S', time.localtime(last_modified)),
             "scan_url": f"{get_full_origin_url()}/scan/{repo_name}"
         })
     else:
@@ -938,6 +2162,8 @@ def api_scan_repository_stream():
     
     def generate():
         try:
+            max_results = parse_max_results(data.get('max_results'))
+            
             # Clone the repository first
             repo_path = clone_repository(repo_url)
             repo_name = os.path.basename(repo_path)
@@ -945,47 +2171,49 @@ def api_scan_repository_stream():
             web_base_url = get_full_origin_url()
             
             # Send initial metadata
-            yield json.dumps({
+            yield ndjson_line({
                 "type": "init",
                 "status": "success",
                 "repo_name": repo_name,
                 "repo_url": origin_url,
                 "web_url": f"{web_base_url}/scan/{repo_url}"
-            }) + "\n"
+            })
             
             # Counter for todos
             todo_count = 0
+            scan_status = {}
             
-            # Stream each TODO as it's found
-            for todo in find_todos(repo_path):
+            # Stream each TODO as it's found, replaying the cached scan if HEAD hasn't moved
+            for todo in iter_todos(repo_path, max_results, scan_status):
                 todo_count += 1
-                yield json.dumps({
+                yield ndjson_line({
                     "type": "todo",
                     "status": "success",
                     "todo": todo.to_dict(),
                     "count": todo_count
-                }) + "\n"
+                })
             
             # Send completion event
-            yield json.dumps({
+            yield ndjson_line({
                 "type": "complete",
                 "status": "success",
                 "count": todo_count,
+                "truncated": scan_status['truncated'],
                 "repo_name": repo_name,
                 "repo_url": origin_url,
                 "web_url": f"{web_base_url}/scan/{repo_url}"
-            }) + "\n"
+            })
             
         except Exception as e:
             app.logger.error(f"Error in streaming API scan: {str(e)}")
             error_message = str(e)
             error_id = getattr(e, 'error_id', None) if isinstance(e, ScannerError) else None
-            yield json.dumps({
+            yield ndjson_line({
                 "type": "error",
                 "status": "error",
                 "error": error_message,
                 "error_id": error_id
-            }) + "\n"
+            })
     
     return Response(
         stream_with_context(generate()),
@@ -996,5 +2224,5 @@ if __name__ == '__main__':
     # Create the repositories directory if it doesn't exist
     ensure_dir_exists(BASE_REPO_PATH)
     
-    # Run the Flask application
-    app.run(debug=True, host='0.0.0.0', port=5000)
\ No newline at end of file
+    # Run the Flask application; set FLASK_DEBUG=1 for the debugger and reloader
+    app.run(debug=os.environ.get('FLASK_DEBUG') == '1', host='0.0.0.0', port=5000, threaded=True)
\ No newline at end of file
@@ -8,15 +8,20 @@ This module provides:
 - Comprehensive logging and monitoring
 """
 
+import asyncio
 import functools
+import inspect
+import itertools
 import logging
+import os
+import random
+import threading
 import time
-import traceback
+from collections import OrderedDict
 from contextlib import contextmanager
 from enum import Enum
 from typing import Optional, Dict, Any, Callable, Union
-from dataclasses import dataclass, asdict
-import json
+from dataclasses import dataclass
 
 # Import Flask current_app, but handle the case when Flask is not installed
 try:
@@ -24,6 +29,22 @@ try:
 except ImportError:
     current_app = None
 
+# Error IDs are a random per-process prefix plus a sequence number. PIDs repeat
+# across container replicas, so the prefix is drawn from the OS once per process
+# rather than on every error
+_error_id_prefix = os.urandom(4).hex()
+_error_id_seq = itertools.count()
+
+
+def _reset_error_id_source():
+    global _error_id_prefix, _error_id_seq
+    _error_id_prefix = os.urandom(4).hex()
+    _error_id_seq = itertools.count()
+
+
+if hasattr(os, 'register_at_fork'):
+    os.register_at_fork(after_in_child=_reset_error_id_source)
+
 class ErrorSeverity(Enum):
     """Error severity levels for categorization and handling"""
     LOW = "low"
@@ -32,6 +53,21 @@ class ErrorSeverity(Enum):
     CRITICAL = "critical"
 
 
+_SEVERITY_LOG_LEVELS = {
+    ErrorSeverity.CRITICAL: logging.CRITICAL,
+    ErrorSeverity.HIGH: logging.ERROR,
+    ErrorSeverity.MEDIUM: logging.WARNING,
+    ErrorSeverity.LOW: logging.INFO,
+}
+
+_SEVERITY_LOG_METHODS = {
+    ErrorSeverity.CRITICAL: 'critical',
+    ErrorSeverity.HIGH: 'error',
+    ErrorSeverity.MEDIUM: 'warning',
+    ErrorSeverity.LOW: 'info',
+}
+
+
 class ErrorCategory(Enum):
     """Categories of errors for better handling and recovery"""
     VALIDATION = "validation"
@@ -43,7 +79,7 @@ class ErrorCategory(Enum):
     EXTERNAL_SERVICE = "external_service"
 
 
-@dataclass
+@dataclass(slots=True)
 class ErrorContext:
     """Context information for errors"""
     operation: str
@@ -56,12 +92,35 @@ class ErrorContext:
     additional_data: Optional[Dict[str, Any]] = None
 
     def to_dict(self) -> Dict[str, Any]:
-        return asdict(self)
+        # Plain attribute reads; asdict() would deep-copy on every logged error
+        return {
+            "operation": self.operation,
+            "component": self.component,
+            "user_id": self.user_id,
+            "session_id": self.session_id,
+            "request_id": self.request_id,
+            "repo_url": self.repo_url,
+            "file_path": self.file_path,
+            "additional_data": dict(self.additional_data) if self.additional_data is not None else None,
+        }
 
 
 class ScannerError(Exception):
     """Base exception class for all scanner-related errors"""
-    
+
+    _USER_MESSAGES = {
+        ErrorCategory.VALIDATION: "Invalid input provided. Please check your data and try again.",
+        ErrorCategory.NETWORK: "Network connectivity issue. Please check your connection and retry.",
+        ErrorCategory.FILESYSTEM: "File system operation failed. Please check permissions and disk space.",
+        ErrorCategory.GIT_OPERATION: "Git operation failed. Please check repository URL and access permissions.",
+        ErrorCategory.PROCESSING: "Processing error occurred. Please try again later.",
+        ErrorCategory.SYSTEM: "System error occurred. Please contact support if the issue persists.",
+        ErrorCategory.EXTERNAL_SERVICE: "External service unavailable. Please try again later."
+    }
+
+    # Set once an ErrorHandler has processed this error
+    _handled = False
+
     def __init__(
         self,
         message: str,
@@ -83,23 +142,36 @@ class ScannerError(Exception):
         self.timestamp = time.time()
         self.error_id = self._generate_error_id()
 
+    @staticmethod
+    def from_exception(
+        error: Exception,
+        context: Optional[ErrorContext] = None
+    ) -> 'ScannerError':
+        """Return error as a ScannerError, wrapping other exceptions as system errors.
+
+        The result is always a plain ScannerError or the error itself, whichever
+        class this is called on.
+        """
+        if isinstance(error, ScannerError):
+            # Always use the provided context if available
+            if context:
+                error.context = context
+            return error
+        return ScannerError(
+            message=str(error),
+            category=ErrorCategory.SYSTEM,
+            severity=ErrorSeverity.MEDIUM,
+            context=context,
+            original_exception=error
+        )
+
     def _generate_error_id(self) -> str:
         """Generate a unique error ID for tracking"""
-        import uuid
-        return f"ERR-{int(self.timestamp)}-{str(uuid.uuid4())[:8]}"
+        return f"ERR-{int(self.timestamp)}-{_error_id_prefix}-{next(_error_id_seq):08x}"
 
     def _generate_user_message(self) -> str:
         """Generate a user-friendly error message"""
-        category_messages = {
-            ErrorCategory.VALIDATION: "Invalid input provided. Please check your data and try again.",
-            ErrorCategory.NETWORK: "Network connectivity issue. Please check your connection and retry.",
-            ErrorCategory.FILESYSTEM: "File system operation failed. Please check permissions and disk space.",
-            ErrorCategory.GIT_OPERATION: "Git operation failed. Please check repository URL and access permissions.",
-            ErrorCategory.PROCESSING: "Processing error occurred. Please try again later.",
-            ErrorCategory.SYSTEM: "System error occurred. Please contact support if the issue persists.",
-            ErrorCategory.EXTERNAL_SERVICE: "External service unavailable. Please try again later."
-        }
-        return category_messages.get(self.category, "An unexpected error occurred. Please try again.")
+        return self._USER_MESSAGES.get(self.category, "An unexpected error occurred. Please try again.")
 
     def to_dict(self) -> Dict[str, Any]:
         """Convert error to dictionary for logging/API responses"""
@@ -199,11 +271,23 @@ class SystemError(ScannerError):
 
 class ErrorHandler:
     """Centralized error handler with logging and recovery strategies"""
+
+    # Identical errors (same category, operation and message) logged within
+    # this many seconds of the first are counted instead of logged again
+    DEDUP_WINDOW = 1.0
+    DEDUP_MAX_KEYS = 1024
+    # Distinct (category, operation) pairs kept in error_counts; the least
+    # recently seen pair is dropped beyond this
+    MAX_TRACKED_ERRORS = 10_000
     
     def __init__(self, logger: logging.Logger):
         self.logger = logger
+        # Counts keyed by (category, operation); joined into strings by get_error_stats
         self.error_counts = {}
         self.recovery_strategies = {}
+        # (category, operation, message) -> [window start, suppressed count], oldest first
+        self._recent_logs = OrderedDict()
+        self._recent_logs_lock = threading.Lock()
 
     def register_recovery_strategy(
         self, 
@@ -220,20 +304,12 @@ class ErrorHandler:
     ) -> ScannerError:
         """Handle an error with appropriate logging and recovery attempts"""
         
-        # Convert regular exceptions to ScannerError
-        if not isinstance(error, ScannerError):
-            scanner_error = ScannerError(
-                message=str(error),
-                category=ErrorCategory.SYSTEM,
-                severity=ErrorSeverity.MEDIUM,
-                context=context,
-                original_exception=error
-            )
-        else:
-            scanner_error = error
-            # Important fix: Always use the provided context if available
-            if context:
-                scanner_error.context = context
+        # An error re-raised through nested handlers is only logged,
+        # counted and recovered once
+        if isinstance(error, ScannerError) and error._handled:
+            return error
+
+        scanner_error = ScannerError.from_exception(error, context)
 
         # Log the error
         self._log_error(scanner_error)
@@ -242,33 +318,60 @@ class ErrorHandler:
         self._track_error(scanner_error)
         
         # Attempt recovery if applicable
-        if scanner_error.recoverable:
+        if scanner_error.recoverable and self.recovery_strategies:
             self._attempt_recovery(scanner_error)
         
+        scanner_error._handled = True
         return scanner_error
 
     def _log_error(self, error: ScannerError):
         """Log error with appropriate level and context"""
+        if not self.logger.isEnabledFor(_SEVERITY_LOG_LEVELS[error.severity]):
+            return
+        suppressed = self._suppressed_since_last_log(error)
+        if suppressed is None:
+            return
+
         log_data = error.to_dict()
-        log_message = f"[{error.error_id}] {error.message}"
+        log_message = "[%s] %s"
+        log_args = [error.error_id, error.message]
         
         if error.context:
-            log_message += f" | Operation: {error.context.operation} | Component: {error.context.component}"
+            log_message += " | Operation: %s | Component: %s"
+            log_args += [error.context.operation, error.context.component]
+        if suppressed:
+            log_message += " | %d identical error(s) not logged"
+            log_args.append(suppressed)
         
-        if error.severity == ErrorSeverity.CRITICAL:
-            self.logger.critical(log_message, extra={"error_data": log_data})
-        elif error.severity == ErrorSeverity.HIGH:
-            self.logger.error(log_message, extra={"error_data": log_data})
-        elif error.severity == ErrorSeverity.MEDIUM:
-            self.logger.warning(log_message, extra={"error_data": log_data})
-        else:
-            self.logger.info(log_message, extra={"error_data": log_data})
+        log = getattr(self.logger, _SEVERITY_LOG_METHODS[error.severity])
+        log(log_message, *log_args, extra={"error_data": log_data})
+
+    def _suppressed_since_last_log(self, error: ScannerError) -> Optional[int]:
+        """Return None if this error repeats one logged within DEDUP_WINDOW,
+        otherwise the number of repeats that were skipped since it was last logged"""
+        key = (error.category, error.context.operation, error.message)
+        now = time.monotonic()
+        with self._recent_logs_lock:
+            entry = self._recent_logs.get(key)
+            if entry is not None and now - entry[0] < self.DEDUP_WINDOW:
+                entry[1] += 1
+                return None
+            suppressed = entry[1] if entry is not None else 0
+            self._recent_logs[key] = [now, 0]
+            self._recent_logs.move_to_end(key)
+            if len(self._recent_logs) > self.DEDUP_MAX_KEYS:
+                self._recent_logs.popitem(last=False)
+        return suppressed
 
     def _track_error(self, error: ScannerError):
         """Track error frequency for monitoring"""
         # Fix: Use the actual context operation instead of 'unknown'
-        key = f"{error.category.value}:{error.context.operation}"
-        self.error_counts[key] = self.error_counts.get(key, 0) + 1
+        counts = self.error_counts
+        key = (error.category, error.context.operation)
+        # Re-inserting keeps the dict ordered from least to most recently seen
+        counts[key] = counts.pop(key, 0) + 1
+        if len(counts) > self.MAX_TRACKED_ERRORS:
+            counts.pop(next(iter(counts)), None)
 
     def _attempt_recovery(self, error: ScannerError):
         """Attempt to recover from error using registered strategies"""
@@ -283,7 +386,31 @@ class ErrorHandler:
 
     def get_error_stats(self) -> Dict[str, int]:
         """Get error statistics for monitoring"""
-        return self.error_counts.copy()
+        return {
+            f"{category.value}:{operation}": count
+            for (category, operation), count in self.error_counts.items()
+        }
+
+
+_default_error_handler = None
+
+
+def _get_error_handler() -> ErrorHandler:
+    """Get the Flask app's error handler, or a shared default outside Flask"""
+    global _default_error_handler
+    if current_app is not None:
+        try:
+            error_handler = getattr(current_app, 'error_handler', None)
+            if not error_handler:
+                error_handler = ErrorHandler(current_app.logger)
+                current_app.error_handler = error_handler
+            return error_handler
+        except RuntimeError:
+            # Outside an app context
+            pass
+    if _default_error_handler is None:
+        _default_error_handler = ErrorHandler(logging.getLogger(__name__))
+    return _default_error_handler
 
 
 class RetryConfig:
@@ -295,18 +422,69 @@ class RetryConfig:
         base_delay: float = 1.0,
         exponential_backoff: bool = True,
         max_delay: float = 60.0,
-        retryable_categories: Optional[set] = None
+        retryable_categories: Optional[set] = None,
+        jitter: float = 0.5
     ):
         self.max_attempts = max_attempts
         self.base_delay = base_delay
         self.exponential_backoff = exponential_backoff
         self.max_delay = max_delay
+        # Fraction of the delay to randomize by, so workers that failed
+        # together don't all retry at the same instant
+        self.jitter = jitter
         self.retryable_categories = retryable_categories or {
             ErrorCategory.NETWORK,
             ErrorCategory.GIT_OPERATION,
             ErrorCategory.EXTERNAL_SERVICE
         }
 
+    def get_delay(self, attempt: int) -> float:
+        """Calculate the delay before retrying after the given attempt"""
+        if self.exponential_backoff:
+            delay = min(self.base_delay * (2 ** attempt), self.max_delay)
+        else:
+            delay = self.base_delay
+        if self.jitter:
+            delay = max(0.0, delay * (1 + random.uniform(-self.jitter, self.jitter)))
+        return delay
+
+
+def _retry_delay(
+    error: Exception,
+    attempt: int,
+    retry_cfg: RetryConfig,
+    error_handler: ErrorHandler,
+    context: ErrorContext
+) -> float:
+    """Handle a failed attempt: raise it if it can't be retried, else return the backoff delay."""
+    handled_error = error_handler.handle_error(error, context)
+    
+    if attempt >= retry_cfg.max_attempts - 1:
+        raise handled_error
+    if isinstance(error, ScannerError) and (
+            not handled_error.recoverable or
+            handled_error.category not in retry_cfg.retryable_categories):
+        raise handled_error
+    
+    # This failure is being retried, not raised; drop its traceback
+    # so the failed call's frames aren't kept alive while we wait
+    error.__traceback__ = None
+    error.__cause__ = error.__context__ = None
+    return retry_cfg.get_delay(attempt)
+
+
+def _retries_exhausted(
+    retry_cfg: RetryConfig,
+    error_handler: ErrorHandler,
+    context: ErrorContext
+) -> ScannerError:
+    """The error to raise when the retry loop ends without a result or a raised failure."""
+    # Every failed attempt raises from _retry_delay once it is the last one,
+    # so this is only reached when no attempt was allowed at all
+    return error_handler.handle_error(
+        ValueError(f"max_attempts must be at least 1, got {retry_cfg.max_attempts}"), context
+    )
+
 
 def with_error_handling(
     operation: str,
@@ -317,69 +495,44 @@ def with_error_handling(
     """Decorator for adding comprehensive error handling to functions"""
     
     def decorator(func: Callable):
+        # Built once per decorated function; errors only ever read it
+        context = ErrorContext(
+            operation=operation,
+            component=component,
+            additional_data=context_data
+        )
+
         @functools.wraps(func)
         def wrapper(*args, **kwargs):
-            # Get error handler from Flask app context or create default
-            try:
-                from flask import current_app
-                error_handler = getattr(current_app, 'error_handler', None)
-                if not error_handler:
-                    error_handler = ErrorHandler(current_app.logger)
-                    current_app.error_handler = error_handler
-            except RuntimeError:
-                # Outside Flask context, create basic handler
-                import logging
-                error_handler = ErrorHandler(logging.getLogger(__name__))
-
-            context = ErrorContext(
-                operation=operation,
-                component=component,
-                additional_data=context_data
-            )
-            
+            error_handler = _get_error_handler()
             retry_cfg = retry_config or RetryConfig()
-            attempt = 0
-            last_error = None
             
-            while attempt < retry_cfg.max_attempts:
+            for attempt in range(retry_cfg.max_attempts):
                 try:
                     return func(*args, **kwargs)
-                    
-                except ScannerError as e:
-                    last_error = e
-                    handled_error = error_handler.handle_error(e, context)
-                    
-                    if (not handled_error.recoverable or 
-                        handled_error.category not in retry_cfg.retryable_categories or
-                        attempt >= retry_cfg.max_attempts - 1):
-                        raise handled_error
-                        
                 except Exception as e:
-                    last_error = e
-                    handled_error = error_handler.handle_error(e, context)
-                    
-                    if attempt >= retry_cfg.max_attempts - 1:
-                        raise handled_error
-                
-                # Calculate delay for next attempt
-                if retry_cfg.exponential_backoff:
-                    delay = min(
-                        retry_cfg.base_delay * (2 ** attempt),
-                        retry_cfg.max_delay
-                    )
-                else:
-                    delay = retry_cfg.base_delay
-                
-                attempt += 1
-                if attempt < retry_cfg.max_attempts:
-                    time.sleep(delay)
+                    delay = _retry_delay(e, attempt, retry_cfg, error_handler, context)
+                time.sleep(delay)
+            
+            raise _retries_exhausted(retry_cfg, error_handler, context)
+
+        @functools.wraps(func)
+        async def async_wrapper(*args, **kwargs):
+            # Same retry loop as wrapper, but backoff yields to the event loop
+            error_handler = _get_error_handler()
+            retry_cfg = retry_config or RetryConfig()
             
-            # If we get here, all retries failed
-            if isinstance(last_error, ScannerError):
-                raise last_error
-            else:
-                raise error_handler.handle_error(last_error, context)
+            for attempt in range(retry_cfg.max_attempts):
+                try:
+                    return await func(*args, **kwargs)
+                except Exception as e:
+                    delay = _retry_delay(e, attempt, retry_cfg, error_handler, context)
+                await asyncio.sleep(delay)
+            
+            raise _retries_exhausted(retry_cfg, error_handler, context)
                 
+        if inspect.iscoroutinefunction(func):
+            return async_wrapper
         return wrapper
     return decorator
 
@@ -397,15 +550,7 @@ def error_context(
         additional_data=context_kwargs
     )
     
-    try:
-        from flask import current_app
-        error_handler = getattr(current_app, 'error_handler', None)
-        if not error_handler:
-            error_handler = ErrorHandler(current_app.logger)
-            current_app.error_handler = error_handler
-    except RuntimeError:
-        import logging
-        error_handler = ErrorHandler(logging.getLogger(__name__))
+    error_handler = _get_error_handler()
     
     try:
         yield context
@@ -422,15 +567,15 @@ def safe_operation(
     """Decorator for operations that should not crash the application"""
     
     def decorator(func: Callable):
+        logger = logging.getLogger(__name__)
+
         @functools.wraps(func)
         def wrapper(*args, **kwargs):
             try:
                 return func(*args, **kwargs)
             except ScannerError as e:
                 if log_errors:
-                    logging.getLogger(__name__).error(
-                        f"Safe operation failed: {func.__name__}: {e.message}"
-                    )
+                    logger.error("Safe operation failed: %s: %s", func.__name__, e.message)
                 
                 if reraise_critical and e.severity == ErrorSeverity.CRITICAL:
                     raise
@@ -439,9 +584,7 @@ def safe_operation(
                 
             except Exception as e:
                 if log_errors:
-                    logging.getLogger(__name__).error(
-                        f"Safe operation failed: {func.__name__}: {str(e)}"
-                    )
+                    logger.error("Safe operation failed: %s: %s", func.__name__, e)
                 return default_return
                 
         return wrapper
@@ -39,6 +39,37 @@ class TestErrorClasses:
         assert error.error_id.startswith("ERR-")
         assert error.timestamp > 0
 
+    def test_error_id_prefix_is_random_per_process(self):
+        """Test that a forked process gets a fresh random prefix instead of one derived from its PID"""
+        from scanner import error_handling
+        
+        first = ScannerError("one", ErrorCategory.SYSTEM).error_id
+        second = ScannerError("two", ErrorCategory.SYSTEM).error_id
+        assert first != second
+        assert first.split("-")[2] == second.split("-")[2]
+        
+        with patch.object(error_handling.os, 'urandom', return_value=bytes.fromhex("deadbeef")):
+            error_handling._reset_error_id_source()
+        try:
+            assert ScannerError("three", ErrorCategory.SYSTEM).error_id.endswith("-deadbeef-00000000")
+        finally:
+            error_handling._reset_error_id_source()
+
+    def test_from_exception(self):
+        """Test that from_exception wraps plain exceptions and passes ScannerErrors through"""
+        context = ErrorContext("test_op", "test_component")
+        original = ValueError("bad value")
+        
+        wrapped = NetworkError.from_exception(original, context)
+        assert type(wrapped) is ScannerError
+        assert wrapped.category == ErrorCategory.SYSTEM
+        assert wrapped.original_exception is original
+        assert wrapped.context is context
+        
+        error = ValidationError("bad input")
+        assert ScannerError.from_exception(error, context) is error
+        assert error.context is context
+
     def test_validation_error(self):
         """Test ValidationError specific behavior"""
         error = ValidationError("Invalid field", field="email")
@@ -124,6 +155,35 @@ class TestErrorHandler:
         assert "validation:test_op" in stats
         assert stats["validation:test_op"] == 2
 
+    def test_error_handled_once(self):
+        """Test that handling the same error again is a no-op"""
+        context = ErrorContext("test_op", "test_component")
+        error = NetworkError("Connection failed")
+        
+        assert self.handler.handle_error(error, context) is error
+        assert self.handler.handle_error(error, ErrorContext("other_op", "other")) is error
+        
+        self.logger.warning.assert_called_once()
+        assert self.handler.get_error_stats() == {"network:test_op": 1}
+        assert error.context is context
+
+    def test_duplicate_errors_logged_once(self):
+        """Test that identical errors within the dedup window are logged once"""
+        context = ErrorContext("test_op", "test_component")
+        for _ in range(3):
+            self.handler.handle_error(ValidationError("Same error"), context)
+        
+        self.logger.info.assert_called_once()
+        assert self.handler.get_error_stats()["validation:test_op"] == 3
+        
+        # Once the window has passed, the next one is logged with the skipped count
+        with patch('scanner.error_handling.time.monotonic', return_value=time.monotonic() + 2):
+            self.handler.handle_error(ValidationError("Same error"), context)
+        
+        assert self.logger.info.call_count == 2
+        message, *args = self.logger.info.call_args[0]
+        assert "2 identical error(s) not logged" in message % tuple(args)
+
     def test_recovery_strategy_registration(self):
         """Test registration and execution of recovery strategies"""
         recovery_called = False
@@ -202,7 +262,7 @@ class TestRetryDecorator:
         call_times = []
         
         @with_error_handling("test_op", "test_component", RetryConfig(
-            max_attempts=3, base_delay=0.1, exponential_backoff=True
+            max_attempts=3, base_delay=0.1, exponential_backoff=True, jitter=0
         ))
         def failing_func():
             call_times.append(time.time())
@@ -217,6 +277,61 @@ class TestRetryDecorator:
         delay2 = call_times[2] - call_times[1]
         assert delay2 > delay1
 
+    def test_backoff_jitter(self):
+        """Test that retry delays are randomized within the jitter range"""
+        @with_error_handling("test_op", "test_component", RetryConfig(
+            max_attempts=2, base_delay=1.0, jitter=0.5
+        ))
+        def failing_func():
+            raise NetworkError("Always fails")
+        
+        with patch('scanner.error_handling.random.uniform', return_value=-0.25) as uniform, \
+                patch('scanner.error_handling.time.sleep') as sleep:
+            with pytest.raises(NetworkError):
+                failing_func()
+        
+        uniform.assert_called_once_with(-0.5, 0.5)
+        sleep.assert_called_once_with(0.75)
+
+    def test_async_retry(self):
+        """Test that coroutine functions are retried with asyncio.sleep"""
+        import asyncio
+        call_count = 0
+        
+        @with_error_handling("test_op", "test_component", RetryConfig(
+            max_attempts=3, base_delay=0.01
+        ))
+        async def failing_coro():
+            nonlocal call_count
+            call_count += 1
+            if call_count < 3:
+                raise NetworkError("Temporary failure")
+            return "success"
+        
+        with patch('scanner.error_handling.time.sleep') as sleep:
+            result = asyncio.run(failing_coro())
+        
+        assert result == "success"
+        assert call_count == 3
+        sleep.assert_not_called()
+
+    def test_no_attempts_raises(self):
+        """Test that both wrappers raise, rather than return None, when no attempt is allowed"""
+        import asyncio
+        
+        @with_error_handling("test_op", "test_component", RetryConfig(max_attempts=0))
+        def sync_op():
+            return "success"
+        
+        @with_error_handling("test_op", "test_component", RetryConfig(max_attempts=0))
+        async def async_op():
+            return "success"
+        
+        with pytest.raises(ScannerError, match="max_attempts"):
+            sync_op()
+        with pytest.raises(ScannerError, match="max_attempts"):
+            asyncio.run(async_op())
+
 
 class TestErrorContext:
     """Test the error context manager"""
@@ -299,7 +414,7 @@ class TestIntegration:
         mock_app.error_handler = handler
         
         # Use monkeypatch instead of patching the import
-        import error_handling
+        from scanner import error_handling
         original_current_app = error_handling.current_app
         try:
             error_handling.current_app = mock_app
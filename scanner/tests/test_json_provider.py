@@ -0,0 +1,32 @@
+import unittest
+import json
+from scanner import app as scanner_app
+from unittest.mock import patch
+
+@unittest.skipIf(scanner_app.orjson is None, "orjson is not installed")
+class TestOrjsonProvider(unittest.TestCase):
+    def setUp(self):
+        self.provider = scanner_app.OrjsonProvider(scanner_app.app)
+
+    def test_keys_are_sorted_when_configured(self):
+        self.assertEqual(self.provider.dumps({'b': 1, 'a': 2}), '{"a":2,"b":1}')
+        self.provider.sort_keys = False
+        self.assertEqual(self.provider.dumps({'b': 1, 'a': 2}), '{"b":1,"a":2}')
+
+    def test_unsupported_options_use_the_default_provider(self):
+        self.assertEqual(self.provider.dumps({'b': 1, 'a': 2}, indent=4), json.dumps({'a': 2, 'b': 1}, indent=4))
+
+    def test_response_is_compact_unless_configured(self):
+        with scanner_app.app.app_context():
+            self.assertEqual(self.provider.response({'b': 1, 'a': [1]}).get_data(as_text=True), '{"a":[1],"b":1}')
+            self.provider.compact = False
+            self.assertEqual(self.provider.response({'a': 1}).get_data(as_text=True), '{\n  "a": 1\n}')
+
+    def test_api_responses_use_the_provider(self):
+        with patch('scanner.app.list_local_repositories', return_value=[]):
+            response = scanner_app.app.test_client().get('/api/mpco/list_repositories')
+        self.assertEqual(response.get_json()['status'], 'success')
+        self.assertTrue(response.get_data(as_text=True).startswith('{"result":'))
+
+if __name__ == '__main__':
+    unittest.main()
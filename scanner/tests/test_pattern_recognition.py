@@ -2,7 +2,10 @@ import unittest
 import os
 import tempfile
 import shutil
-from app import TodoItem, find_todos
+import subprocess
+from scanner import app as scanner_app
+from scanner.app import TodoItem, find_todos, iter_todos, parse_max_results, MAX_TODO_RESULTS, MAX_TODO_RESULTS_LIMIT
+from scanner.error_handling import ValidationError
 from unittest.mock import patch
 
 class TestTodoPatternRecognition(unittest.TestCase):
@@ -20,13 +23,7 @@ class TestTodoPatternRecognition(unittest.TestCase):
             f.write(content)
         return file_path
         
-    @patch('app.is_git_ignored')
-    @patch('app.is_text_file')
-    def test_basic_todo_patterns(self, mock_is_text_file, mock_is_git_ignored):
-        # Make sure our file is treated as a text file and not git ignored
-        mock_is_text_file.return_value = True
-        mock_is_git_ignored.return_value = False
-        
+    def test_basic_todo_patterns(self):
         # Create a test file with various TODO comment formats
         test_content = """
         # TODO: Fix this function
@@ -67,5 +64,342 @@ class TestTodoPatternRecognition(unittest.TestCase):
                 f"Could not find expected pattern: {expected_pattern}"
             )
 
+    def test_git_ignored_files_are_skipped(self):
+        subprocess.run(['git', 'init', '-q', self.test_repo_path], check=True)
+        self.create_test_file('.gitignore', "ignored.py\nbuild/\n")
+        self.create_test_file('kept.py', "# TODO: keep me\n")
+        self.create_test_file('ignored.py', "# TODO: skip me\n")
+        os.mkdir(os.path.join(self.test_repo_path, 'build'))
+        self.create_test_file(os.path.join('build', 'out.py'), "# TODO: skip me too\n")
+
+        self.assertEqual(
+            scanner_app.git_ignored_paths(self.test_repo_path, ['kept.py', 'ignored.py', 'build/out.py']),
+            {'ignored.py', 'build/out.py'}
+        )
+        self.assertEqual([todo.file_path for todo in find_todos(self.test_repo_path)], ['kept.py'])
+
+    def test_file_type_from_extension(self):
+        rust_file = self.create_test_file('lib.rs', "// TODO: handle errors\n")
+        self.create_test_file('image.png', "# TODO: not text\n")
+        with patch('scanner.app._sniff_is_text') as mock_sniff:
+            self.assertTrue(scanner_app.is_text_file(rust_file))
+            self.assertFalse(scanner_app.is_text_file(os.path.join(self.test_repo_path, 'image.png')))
+        mock_sniff.assert_not_called()
+        self.assertEqual([todo.file_path for todo in find_todos(self.test_repo_path)], ['lib.rs'])
+
+    def test_highlight_escapes_todo_text(self):
+        highlighted = scanner_app.highlight_todo('<!-- TODO: drop <script>alert("x")</script> & co -->')
+        self.assertEqual(
+            str(highlighted),
+            '<span class="highlight">&lt;!-- TODO</span>: drop '
+            '&lt;script&gt;alert(&#34;x&#34;)&lt;/script&gt; &amp; co --&gt;'
+        )
+        self.assertNotIn('<script>', scanner_app.app.jinja_env.from_string('{{ t|highlight_todo }}').render(
+            t='# TODO <script>alert(1)</script>'))
+
+    @unittest.skipIf(scanner_app.pathspec is None, "pathspec is not installed")
+    def test_gitignore_files_apply_outside_git(self):
+        files = {
+            '.gitignore': "logs/\n*.log\n!keep.log\n",
+            'main.py': "# TODO: kept\n",
+            'drop.log': "# TODO: ignored by *.log\n",
+            'keep.log': "# TODO: re-included by !keep.log\n",
+            os.path.join('logs', 'app.py'): "# TODO: inside an ignored directory\n",
+            os.path.join('sub', '.gitignore'): "build\n",
+            os.path.join('sub', 'build', 'out.py'): "# TODO: ignored by sub/.gitignore\n",
+            os.path.join('build', 'out.py'): "# TODO: sub/.gitignore doesn't apply here\n",
+        }
+        for name, content in files.items():
+            os.makedirs(os.path.dirname(os.path.join(self.test_repo_path, name)), exist_ok=True)
+            self.create_test_file(name, content)
+
+        walked = [rel_path for _, rel_path in scanner_app._iter_repo_files(self.test_repo_path)]
+        self.assertNotIn(os.path.join('logs', 'app.py'), walked)
+        self.assertNotIn(os.path.join('sub', 'build', 'out.py'), walked)
+
+        # Not a git work tree, so the pathspec fallback decides what is ignored
+        self.assertIsNone(scanner_app.git_ignored_paths(self.test_repo_path, walked))
+        self.assertEqual(scanner_app.gitignore_matched_paths(self.test_repo_path, walked), {'drop.log'})
+        self.assertEqual([todo.file_path for todo in find_todos(self.test_repo_path)],
+                         [os.path.join('build', 'out.py'), 'keep.log', 'main.py'])
+
+class TestMatchBackends(unittest.TestCase):
+    CONTENT = (
+        b"## TODO: doubled hash\n"
+        b"TODO: no comment marker\n"
+        b"x = 1  # TODO\n"
+        b": continues the line above\n"
+        b"# FIXME\n"
+        b"\n"
+        b"  : colon after a blank line\n"
+        b"#TODOS are not todos\n"
+        b"// note: last line"
+    )
+    EXPECTED_LINES = [1, 3, 5, 9]
+
+    def setUp(self):
+        self.test_repo_path = tempfile.mkdtemp()
+        self.file_path = os.path.join(self.test_repo_path, 'todos.py')
+        with open(self.file_path, 'wb') as f:
+            f.write(self.CONTENT)
+
+    def tearDown(self):
+        shutil.rmtree(self.test_repo_path)
+
+    def backends(self):
+        yield 're', patch.object(scanner_app, 'hyperscan', None)
+        if scanner_app.hyperscan is None:
+            self.skipTest("hyperscan is not installed")
+        yield 'hyperscan', patch.object(scanner_app, 'hyperscan', scanner_app.hyperscan)
+
+    def test_backends_report_the_same_lines(self):
+        for name, backend in self.backends():
+            with self.subTest(backend=name), backend:
+                todos = scanner_app._scan_file(self.test_repo_path, self.file_path, 'todos.py')
+                self.assertEqual([todo.line_num for todo in todos], self.EXPECTED_LINES)
+
+    def test_backends_report_the_same_starts(self):
+        starts = {}
+        for name, backend in self.backends():
+            with backend:
+                starts[name] = scanner_app._todo_match_starts(self.CONTENT)
+        self.assertEqual(starts['hyperscan'], starts['re'])
+
+class TestScanPathParity(unittest.TestCase):
+    def setUp(self):
+        self.test_repo_path = tempfile.mkdtemp()
+        files = {
+            'b.py': "x = 1\n# TODO",
+            os.path.join('a', 'z.py'): "# TODO: z\n",
+            'a.py': "// FIXME: a\ncode\n# todo\n#TODOS are not todos\n",
+            'A.py': "# NOTE x\n",
+        }
+        os.mkdir(os.path.join(self.test_repo_path, 'a'))
+        for name, content in files.items():
+            with open(os.path.join(self.test_repo_path, name), 'w', encoding='utf-8') as f:
+                f.write(content)
+        subprocess.run(['git', 'init', '-q', self.test_repo_path], check=True)
+        subprocess.run(['git', '-C', self.test_repo_path, 'add', 'b.py', 'a.py'], check=True)
+
+    def tearDown(self):
+        shutil.rmtree(self.test_repo_path)
+
+    def scan(self, max_results, use_git_grep):
+        def no_git_grep(repo_path):
+            return False
+            yield
+        if use_git_grep:
+            return [tuple(todo.to_dict().values()) for todo in find_todos(self.test_repo_path, max_results)]
+        with patch('scanner.app._git_grep_todos', no_git_grep):
+            return [tuple(todo.to_dict().values()) for todo in find_todos(self.test_repo_path, max_results)]
+
+    def test_git_grep_and_walker_agree(self):
+        expected_locations = [('A.py', 1), ('a.py', 1), ('a.py', 3), ('a/z.py', 1), ('b.py', 2)]
+        for max_results in (MAX_TODO_RESULTS, 3):
+            with self.subTest(max_results=max_results):
+                git_grep_todos = self.scan(max_results, use_git_grep=True)
+                walker_todos = self.scan(max_results, use_git_grep=False)
+                self.assertEqual(walker_todos, git_grep_todos)
+                self.assertEqual([todo[:2] for todo in walker_todos], expected_locations[:max_results])
+
+class TestGitMetadata(unittest.TestCase):
+    def setUp(self):
+        self.base_path = tempfile.mkdtemp()
+        self.repo_path = os.path.join(self.base_path, 'repo')
+        subprocess.run(['git', 'init', '-q', '-b', 'main', self.repo_path], check=True)
+        
+    def tearDown(self):
+        shutil.rmtree(self.base_path)
+        
+    def git(self, *args, cwd=None):
+        result = subprocess.run(['git', '-C', cwd or self.repo_path, '-c', 'user.name=test',
+                                 '-c', 'user.email=test@example.com', *args],
+                                check=True, capture_output=True, text=True)
+        return result.stdout.strip()
+        
+    def commit(self, cwd=None):
+        self.git('commit', '-q', '--allow-empty', '-m', 'commit', cwd=cwd)
+        return self.git('rev-parse', 'HEAD', cwd=cwd)
+        
+    def test_head_on_a_branch(self):
+        sha = self.commit()
+        self.assertEqual(scanner_app._read_head_sha(self.repo_path), sha)
+        
+    def test_detached_head(self):
+        first = self.commit()
+        self.commit()
+        self.git('checkout', '-q', '--detach', first)
+        self.assertEqual(scanner_app._read_head_sha(self.repo_path), first)
+        
+    def test_head_ref_only_in_packed_refs(self):
+        sha = self.commit()
+        self.git('pack-refs', '--all')
+        self.assertFalse(os.path.exists(os.path.join(self.repo_path, '.git', 'refs', 'heads', 'main')))
+        self.assertEqual(scanner_app._read_head_sha(self.repo_path), sha)
+        
+    def test_unborn_branch(self):
+        self.assertIsNone(scanner_app._read_head_sha(self.repo_path))
+        self.assertIsNone(scanner_app.get_repo_head(self.repo_path))
+        
+    def test_gitdir_file(self):
+        separate_path = os.path.join(self.base_path, 'separate')
+        git_dir = os.path.join(self.base_path, 'separate.git')
+        subprocess.run(['git', 'init', '-q', '--separate-git-dir', git_dir, separate_path], check=True)
+        sha = self.commit(cwd=separate_path)
+        self.assertTrue(os.path.isfile(os.path.join(separate_path, '.git')))
+        self.assertEqual(scanner_app._read_head_sha(separate_path), sha)
+        
+    def test_worktree_falls_back_to_git(self):
+        self.commit()
+        worktree_path = os.path.join(self.base_path, 'worktree')
+        self.git('worktree', 'add', '-q', '-b', 'feature', worktree_path)
+        sha = self.commit(cwd=worktree_path)
+        # The branch ref lives in the main repository's git directory, which
+        # _read_head_sha doesn't follow; git rev-parse resolves it instead
+        self.assertIsNone(scanner_app._read_head_sha(worktree_path))
+        self.assertEqual(scanner_app.get_repo_head(worktree_path), sha)
+
+    def write_config(self, text):
+        config_path = os.path.join(self.repo_path, '.git', 'config')
+        with open(config_path, 'w', encoding='utf-8') as f:
+            f.write(text)
+        return scanner_app._read_origin_url(self.repo_path)
+
+    def test_origin_url_with_comments_and_odd_case(self):
+        url = self.write_config(
+            '[core]\n\tbare = false\n'
+            '# [remote "origin"]\n\turl = https://example.com/commented/out.git\n'
+            '[remote "upstream"]\n\turl = https://example.com/upstream/repo.git\n'
+            '[Remote "origin"]  ; the one we want\n'
+            '\t; url = https://example.com/also/commented.git\n'
+            '\tfetch = +refs/heads/*:refs/remotes/origin/*\n'
+            '\tURL = https://example.com/foo/bar.git\n'
+        )
+        self.assertEqual(url, 'https://example.com/foo/bar.git')
+
+    def test_origin_url_forms_left_to_git(self):
+        for value in ('"https://example.com/foo/bar.git"', 'https://example.com/foo/bar.git # old'):
+            with self.subTest(value=value):
+                self.assertIsNone(self.write_config(f'[remote "origin"]\n\turl = {value}\n'))
+                self.assertEqual(scanner_app.get_repo_origin_url(self.repo_path), 'https://example.com/foo/bar.git')
+
+class TestResultLimits(unittest.TestCase):
+    def setUp(self):
+        self.test_repo_path = tempfile.mkdtemp()
+        with open(os.path.join(self.test_repo_path, 'todos.py'), 'w', encoding='utf-8') as f:
+            f.write("# TODO: one\n# TODO: two\n# TODO: three\n")
+        
+    def tearDown(self):
+        shutil.rmtree(self.test_repo_path)
+        
+    def scan(self, max_results):
+        status = {}
+        todos = list(find_todos(self.test_repo_path, max_results, status))
+        return todos, status['truncated']
+        
+    def test_exact_cap_is_not_truncated(self):
+        todos, truncated = self.scan(3)
+        self.assertEqual(len(todos), 3)
+        self.assertFalse(truncated)
+        
+    def test_over_cap_is_truncated(self):
+        todos, truncated = self.scan(2)
+        self.assertEqual(len(todos), 2)
+        self.assertTrue(truncated)
+        
+    def test_under_cap_is_not_truncated(self):
+        todos, truncated = self.scan(10)
+        self.assertEqual(len(todos), 3)
+        self.assertFalse(truncated)
+        
+    def test_parse_max_results(self):
+        self.assertEqual(parse_max_results(None), MAX_TODO_RESULTS)
+        self.assertEqual(parse_max_results(''), MAX_TODO_RESULTS)
+        self.assertEqual(parse_max_results('25'), 25)
+        self.assertEqual(parse_max_results(MAX_TODO_RESULTS_LIMIT + 1), MAX_TODO_RESULTS_LIMIT)
+        
+    def test_parse_max_results_rejects_invalid_values(self):
+        for value in ('abc', '1.5', [], 0, -1, '0'):
+            with self.subTest(value=value):
+                with self.assertRaises(ValidationError):
+                    parse_max_results(value)
+
+class TestScanCache(unittest.TestCase):
+    def setUp(self):
+        self.base_path = tempfile.mkdtemp()
+        self.repo_path = os.path.join(self.base_path, 'repo')
+        os.mkdir(self.repo_path)
+        with open(os.path.join(self.repo_path, 'todos.py'), 'w', encoding='utf-8') as f:
+            f.write("# TODO: one\n# TODO: two\n# TODO: three\n")
+        subprocess.run(['git', 'init', '-q', self.repo_path], check=True)
+        self.commit()
+        patcher = patch.object(scanner_app, 'BASE_REPO_PATH', self.base_path)
+        patcher.start()
+        self.addCleanup(patcher.stop)
+        scanner_app._clear_todo_cache()
+        
+    def tearDown(self):
+        scanner_app._clear_todo_cache()
+        shutil.rmtree(self.base_path)
+        
+    def commit(self):
+        subprocess.run(['git', '-C', self.repo_path, 'add', '-A'], check=True)
+        subprocess.run(['git', '-C', self.repo_path, '-c', 'user.name=test', '-c', 'user.email=test@example.com',
+                        'commit', '-q', '--allow-empty', '-m', 'commit'], check=True)
+        
+    def cache_files(self):
+        cache_dir = os.path.join(self.base_path, scanner_app.TODO_CACHE_DIRNAME)
+        return sorted(os.path.relpath(os.path.join(root, name), cache_dir)
+                      for root, _, names in os.walk(cache_dir) for name in names)
+        
+    def test_scan_stops_at_cap_and_serves_smaller_caps(self):
+        status = {}
+        self.assertEqual(len(list(iter_todos(self.repo_path, 2, status))), 2)
+        self.assertTrue(status['truncated'])
+        self.assertEqual(len(self.cache_files()), 1)
+        
+        with patch('scanner.app.find_todos') as mock_find_todos:
+            status = {}
+            self.assertEqual(len(list(iter_todos(self.repo_path, 1, status))), 1)
+            self.assertTrue(status['truncated'])
+            # Replayed from disk rather than memory
+            scanner_app._clear_todo_cache()
+            status = {}
+            self.assertEqual(len(list(iter_todos(self.repo_path, 2, status))), 2)
+            self.assertTrue(status['truncated'])
+        mock_find_todos.assert_not_called()
+        
+    def test_larger_cap_rescans_a_truncated_scan(self):
+        list(iter_todos(self.repo_path, 1))
+        status = {}
+        self.assertEqual(len(list(iter_todos(self.repo_path, 3, status))), 3)
+        self.assertFalse(status['truncated'])
+        
+        # A complete scan serves any cap
+        with patch('scanner.app.find_todos') as mock_find_todos:
+            status = {}
+            self.assertEqual(len(list(iter_todos(self.repo_path, 10, status))), 3)
+            self.assertFalse(status['truncated'])
+        mock_find_todos.assert_not_called()
+        
+    def test_memory_cache_is_bounded_by_rows(self):
+        with patch.object(scanner_app, 'TODO_CACHE_MAX_ROWS', 5):
+            for name in ('a', 'b', 'c'):
+                scanner_app._remember_todos((name, 'head'), ((('f', 1, 'TODO', ''),) * 2, 2, True))
+        self.assertEqual(list(scanner_app._todo_cache), [('b', 'head'), ('c', 'head')])
+        self.assertEqual(scanner_app._todo_cache_rows, 4)
+        
+    def test_other_heads_and_versions_are_removed(self):
+        stale_version = os.path.join(self.base_path, scanner_app.TODO_CACHE_DIRNAME, 'v1-old', 'repo')
+        os.makedirs(stale_version)
+        open(os.path.join(stale_version, 'stale.json'), 'w').close()
+        list(iter_todos(self.repo_path))
+        self.commit()
+        list(iter_todos(self.repo_path))
+        
+        head = scanner_app.get_repo_head(self.repo_path)
+        self.assertEqual(self.cache_files(),
+                         [os.path.join(scanner_app.TODO_CACHE_VERSION, 'repo', f'{head}.json')])
+
 if __name__ == '__main__':
     unittest.main()
\ No newline at end of file
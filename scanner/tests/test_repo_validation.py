@@ -0,0 +1,193 @@
+import unittest
+import os
+import tempfile
+import shutil
+import subprocess
+import sys
+import io
+import gc
+from scanner import app as scanner_app
+from scanner.app import REPO_URL_RE, validate_repo_name, clone_repository, repo_name_from_url
+from scanner.error_handling import ValidationError
+from unittest.mock import patch, Mock
+
+class TestRepoNameValidation(unittest.TestCase):
+    def test_rejects_names_outside_base_path(self):
+        for repo_name in ('../x', '/etc', '.', '..', 'a/b', '', None, 'owner__repo\n', '..\n'):
+            with self.subTest(repo_name=repo_name):
+                with self.assertRaises(ValidationError):
+                    validate_repo_name(repo_name)
+
+    def test_accepts_plain_names(self):
+        for repo_name in ('repo', 'foo__bar', 'my-repo.v2', '.hidden'):
+            with self.subTest(repo_name=repo_name):
+                validate_repo_name(repo_name)
+
+class TestRepoUrlValidation(unittest.TestCase):
+    def test_accepts_git_urls(self):
+        for repo_url in (
+            'https://github.com/foo/bar.git',
+            'https://github.com/foo/bar',
+            'http://gitlab.example.com/group/sub/bar/',
+            'ssh://git@github.com/foo/bar.git',
+            'git://example.com/foo/bar.git',
+            'git@github.com:foo/bar.git',
+        ):
+            with self.subTest(repo_url=repo_url):
+                self.assertTrue(REPO_URL_RE.fullmatch(repo_url))
+
+    def test_rejects_other_schemes_and_paths(self):
+        for repo_url in (
+            'file:///etc/passwd',
+            'ftp://example.com/foo/bar.git',
+            'ext::sh -c touch% /tmp/pwned',
+            '/etc',
+            '../x',
+            'https://github.com',
+            '--upload-pack=touch /tmp/pwned',
+            'https://github.com/o/r\n',
+            'git@github.com:o/r\n',
+        ):
+            with self.subTest(repo_url=repo_url):
+                self.assertIsNone(REPO_URL_RE.fullmatch(repo_url))
+
+    @patch('scanner.app._run_git_clone')
+    def test_clone_rejects_invalid_urls_without_running_git(self, mock_run_git_clone):
+        for repo_url in ('file:///etc', '../x', '..', '/etc', 'https://github.com/o/r\n'):
+            with self.subTest(repo_url=repo_url):
+                with self.assertRaises(ValidationError):
+                    clone_repository(repo_url)
+        mock_run_git_clone.assert_not_called()
+
+class TestRepoNameFromUrl(unittest.TestCase):
+    def test_spellings_of_one_repo_share_a_name(self):
+        for repo_url in (
+            'https://github.com/foo/bar',
+            'https://github.com/foo/bar/',
+            'git@github.com:foo/bar.git',
+            'https://github.com/foo/bar.git',
+        ):
+            with self.subTest(repo_url=repo_url):
+                self.assertEqual(repo_name_from_url(repo_url), 'foo__bar')
+
+    def test_nested_groups(self):
+        self.assertEqual(repo_name_from_url('https://gitlab.com/group/sub/bar.git'), 'group__sub__bar')
+        self.assertEqual(repo_name_from_url('git@gitlab.com:group/sub/bar.git'), 'group__sub__bar')
+
+    def test_same_name_under_different_owners(self):
+        self.assertNotEqual(
+            repo_name_from_url('https://github.com/foo/bar'),
+            repo_name_from_url('https://github.com/baz/bar'),
+        )
+
+class TestCloneProgress(unittest.TestCase):
+    def fake_git(self, stderr, returncode=0):
+        process = Mock(stderr=io.BytesIO(stderr))
+        process.wait.return_value = returncode
+        process.poll.return_value = returncode
+        return process
+
+    def test_progress_lines_are_relayed(self):
+        stderr = (b"Cloning into 'bar'...\n"
+                  b"Receiving objects:  50% (1/2)\rReceiving objects: 100% (2/2), done.\n"
+                  b"Resolving deltas: 100% (1/1), done.")
+        lines = []
+        with patch('scanner.app.subprocess.Popen', return_value=self.fake_git(stderr)) as mock_popen:
+            scanner_app._run_git_clone(['https://github.com/foo/bar', '/tmp/bar'], progress=lines.append)
+        self.assertIn('--progress', mock_popen.call_args.args[0])
+        self.assertEqual(lines, [
+            "Cloning into 'bar'...",
+            "Receiving objects:  50% (1/2)",
+            "Receiving objects: 100% (2/2), done.",
+        ])
+
+    def test_failure_reports_the_output_tail(self):
+        with patch('scanner.app.subprocess.Popen', return_value=self.fake_git(b"fatal: not found\n", 128)):
+            with self.assertRaises(subprocess.CalledProcessError) as raised:
+                scanner_app._run_git_clone(['https://github.com/foo/bar', '/tmp/bar'], progress=lambda line: None)
+        self.assertEqual(raised.exception.stderr, 'fatal: not found')
+
+    def test_timeout_kills_git(self):
+        real_popen = subprocess.Popen
+        processes = []
+        def hanging_git(command, **kwargs):
+            processes.append(real_popen([sys.executable, '-c', 'import time; time.sleep(30)'], **kwargs))
+            return processes[-1]
+        with patch.object(scanner_app, 'CLONE_TIMEOUT', 0.2), \
+                patch('scanner.app.subprocess.Popen', side_effect=hanging_git):
+            with self.assertRaises(subprocess.TimeoutExpired):
+                scanner_app._run_git_clone(['https://github.com/foo/bar', '/tmp/bar'], progress=lambda line: None)
+        self.assertIsNotNone(processes[0].poll())
+
+    def test_failing_progress_callback_kills_git(self):
+        real_popen = subprocess.Popen
+        processes = []
+        def chatty_git(command, **kwargs):
+            script = 'import sys, time; sys.stderr.write("Receiving objects: 1%\\n"); sys.stderr.flush(); time.sleep(30)'
+            processes.append(real_popen([sys.executable, '-c', script], **kwargs))
+            return processes[-1]
+        def progress(line):
+            raise RuntimeError("client went away")
+        with patch('scanner.app.subprocess.Popen', side_effect=chatty_git):
+            with self.assertRaises(RuntimeError):
+                scanner_app._run_git_clone(['https://github.com/foo/bar', '/tmp/bar'], progress=progress)
+        self.assertIsNotNone(processes[0].poll())
+
+    def test_stream_clone_runs_in_app_context(self):
+        handlers = []
+        def clone(repo_url, progress=None):
+            from scanner.error_handling import _get_error_handler
+            handlers.append(_get_error_handler())
+            raise ValidationError("no such repository")
+        with patch('scanner.app.clone_repository', side_effect=clone):
+            body = scanner_app.app.test_client().get('/stream_data/foo').get_data(as_text=True)
+        self.assertIn('no such repository', body)
+        self.assertIs(handlers[0], scanner_app.app.error_handler)
+
+class TestRepoLocks(unittest.TestCase):
+    def test_locks_are_shared_and_dropped_when_unused(self):
+        lock = scanner_app._repo_lock('/repos/one')
+        self.assertIs(scanner_app._repo_lock('/repos/one'), lock)
+        self.assertIsNot(scanner_app._repo_lock('/repos/two'), lock)
+        del lock
+        gc.collect()
+        self.assertNotIn('/repos/one', scanner_app._repo_locks)
+        self.assertNotIn('/repos/two', scanner_app._repo_locks)
+
+class TestPullValidation(unittest.TestCase):
+    def setUp(self):
+        self.base_path = tempfile.mkdtemp()
+        patcher = patch.object(scanner_app, 'BASE_REPO_PATH', os.path.join(self.base_path, 'repositories'))
+        patcher.start()
+        self.addCleanup(patcher.stop)
+        self.client = scanner_app.app.test_client()
+
+    def tearDown(self):
+        shutil.rmtree(self.base_path)
+
+    @patch('scanner.app.pull_repository')
+    def test_pull_rejects_traversal_names(self, mock_pull_repository):
+        raised = []
+
+        def record_validation(repo_name, field="repo_name"):
+            try:
+                validate_repo_name(repo_name, field)
+            except ValidationError as e:
+                raised.append(e)
+                raise
+
+        with patch('scanner.app.validate_repo_name', side_effect=record_validation):
+            for repo_name in ('../x', '..', '/etc', '.', 'owner__repo\n'):
+                with self.subTest(repo_name=repo_name):
+                    response = self.client.post('/api/mpco/pull_repository', json={'repo_name': repo_name})
+                    data = response.get_json()
+                    self.assertEqual(data['status'], 'error')
+                    self.assertIn('Invalid repository name', data['error'])
+                    self.assertIsInstance(raised[-1], ValidationError)
+                    self.assertEqual(raised[-1].field, 'repo_name')
+
+        self.assertEqual(len(raised), 5)
+        mock_pull_repository.assert_not_called()
+
+if __name__ == '__main__':
+    unittest.main()